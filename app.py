@@ -5,32 +5,36 @@ What the Dream Obscures - Interactive Web Application
 Flask backend for navigating MoMA's latent space and generating artwork visualizations.
 """
 
+from startup import profile
+
 import json
-import numpy as np
-import pickle
-from pathlib import Path
 import os
-from dotenv import load_dotenv
+import time
 import io
 import base64
-
-from flask import Flask, render_template, jsonify, request
-from sklearn.metrics.pairwise import cosine_similarity
-import replicate
-
-# For generating metadata visualizations
-try:
-    from PIL import Image, ImageDraw, ImageFont
-    import matplotlib
-    matplotlib.use('Agg')  # Non-interactive backend
-    import matplotlib.pyplot as plt
-    VISUALIZATION_AVAILABLE = True
-except ImportError:
-    VISUALIZATION_AVAILABLE = False
-    print("⚠️  Warning: PIL/matplotlib not available for metadata visualizations")
-
-# Load environment variables
-load_dotenv()
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+with profile.stage('import numpy'):
+    import numpy as np
+with profile.stage('import flask'):
+    from flask import Flask, render_template, jsonify, request, send_file, make_response, Response, g, has_app_context, stream_with_context
+
+with profile.stage('import app modules'):
+    from export import EXPORT_DTYPES, iter_npy, parse_rows, selection_length
+    from generators import backend_from_env
+    from logs import configure_logging, get_logger
+    from metrics import count, in_flight, registry, timed
+    from sampling import parse_weights
+    from snapshot import SnapshotStore
+    from tiles import tiles_version
+
+# Load environment variables (before anything reads LOG_LEVEL and friends)
+with profile.stage('load .env'):
+    from dotenv import load_dotenv
+    load_dotenv()
+
+configure_logging()
+log = get_logger('app')
 
 # Set up Replicate API
 REPLICATE_API_TOKEN = os.getenv('REPLICATE_API_TOKEN')
@@ -40,68 +44,107 @@ if REPLICATE_API_TOKEN:
 else:
     print("⚠️  Warning: No Replicate API token found in .env file")
 
+# Image generator (Replicate, or a local stand-in for load tests; see generators.py).
+# The replicate client itself is imported on the first AI generation.
+generator = backend_from_env(REPLICATE_API_TOKEN)
+print(f"✓ Image generator backend: {generator.name}")
+
 app = Flask(__name__, 
             template_folder='templates',
             static_folder='static')
 
-# Load latent space
-print("Loading latent space...")
-LATENT_DIR = Path('outputs/latent_space')
-
-embeddings = np.load(LATENT_DIR / 'embeddings_reduced.npy')
-with open(LATENT_DIR / 'artworks.json', 'r') as f:
-    artworks = json.load(f)
-with open(LATENT_DIR / 'descriptions.json', 'r') as f:
-    descriptions = json.load(f)
-with open(LATENT_DIR / 'metadata.json', 'r') as f:
-    metadata = json.load(f)
-
-# Load artists for additional info
-with open('data/artworks/moma_data/Artists.json', 'r') as f:
-    artists_data = json.load(f)
-artists = {a['ConstituentID']: a for a in artists_data}
-
-print(f"✓ Loaded {len(artworks):,} artworks")
-print(f"✓ Embedding dimensions: {embeddings.shape[1]}")
+# Similarity search shards (0 = search in-process; see search.py, which
+# forks them, before combining with reloads or LAZY_STARTUP)
+SEARCH_WORKERS = int(os.getenv('SEARCH_WORKERS', '0'))
+
+# Threads rendering GAN and AI results for /api/navigate/stream
+stream_pool = ThreadPoolExecutor(max_workers=int(os.getenv('STREAM_WORKERS', '16')),
+                                 thread_name_prefix='stream')
+
+# Serve requests while the latent space loads in the background (see /ready)
+LAZY_STARTUP = os.getenv('LAZY_STARTUP', '0') == '1'
+
+# Load latent space (the published snapshot; see snapshot.py)
+if LAZY_STARTUP:
+    snapshots = SnapshotStore(search_workers=SEARCH_WORKERS, background=True)
+    print("✓ Loading latent space in the background (GET /ready for progress)")
+else:
+    print("Loading latent space...")
+    with profile.stage('load latent space'):
+        snapshots = SnapshotStore(search_workers=SEARCH_WORKERS)
+    print(f"✓ Loaded {len(snapshots.current):,} artworks (snapshot {snapshots.current.version})")
+    print(f"✓ Embedding dimensions: {snapshots.current.embeddings.shape[1]}")
+print(f"✓ Started in {time.time() - profile.origin:.2f}s ({profile.summary()})")
 print()
 
-# Cache for generated images
-generated_images = {}
+TILE_MAX_AGE = 7 * 24 * 3600  # Tile URLs carry a content hash, so tiles never change
+DETAIL_MAX_AGE = 7 * 24 * 3600  # For ?v=<version> artwork URLs; details never change within a snapshot
+
+
+def current_snapshot():
+    """The snapshot pinned to this request, so a reload never switches it mid-request"""
+    if has_app_context():
+        if 'snapshot' not in g:
+            g.snapshot = snapshots.current
+        return g.snapshot
+    return snapshots.current
+
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+
+@app.before_request
+def require_snapshot():
+    """Until a background load finishes, only probes and static files are served"""
+    if not snapshots.ready and request.endpoint not in ('ready', 'metrics', 'static'):
+        response = jsonify({'error': 'Latent space is still loading', 'status': snapshots.status})
+        response.status_code = 503
+        response.headers['Retry-After'] = '1'
+        return response
+
+
+@app.after_request
+def record_request_latency(response):
+    if 'request_start' in g:
+        start = g.request_start
+        labels = {'endpoint': request.endpoint or 'unmatched', 'method': request.method,
+                  'status': str(response.status_code)}
+
+        def observe():
+            registry.observe('http_request_duration_seconds', time.perf_counter() - start, **labels)
+
+        # Streamed bodies (exports, navigation streams) count until the last byte is sent
+        if response.is_streamed:
+            response.call_on_close(observe)
+        else:
+            observe()
+    return response
+
+
+@app.after_request
+def add_snapshot_version(response):
+    """Tell clients which build indices refer to, so their caches can be invalidated"""
+    if g.get('snapshot') is not None:
+        response.headers['X-Snapshot-Version'] = g.snapshot.version
+    return response
 
 
 def get_artwork_details(idx):
-    """Get full details for an artwork"""
-    artwork = artworks[idx]
-    details = {
-        'index': idx,
-        'title': artwork.get('Title', 'Untitled'),
-        'artist': artwork.get('Artist', 'Unknown'),
-        'date': artwork.get('Date', 'Unknown'),
-        'medium': artwork.get('Medium', 'Unknown'),
-        'dimensions': artwork.get('Dimensions', 'Unknown'),
-        'classification': artwork.get('Classification', 'Unknown'),
-        'department': artwork.get('Department', 'Unknown'),
-        'date_acquired': artwork.get('DateAcquired', 'Unknown'),
-        'credit_line': artwork.get('CreditLine', 'Unknown'),
-        'description': descriptions[idx]
-    }
-    
-    # Add artist details
-    if artwork.get('ConstituentID'):
-        const_ids = artwork['ConstituentID']
-        if isinstance(const_ids, list) and const_ids:
-            artist_id = const_ids[0]
-            if artist_id in artists:
-                artist = artists[artist_id]
-                details['nationality'] = artist.get('Nationality', 'Unknown')
-                details['gender'] = artist.get('Gender', 'Unknown')
-                details['birth_year'] = artist.get('BeginDate', 'Unknown')
-                details['death_year'] = artist.get('EndDate', 'Unknown')
-    
-    return details
+    """Get full details for an artwork (a fresh dict callers may modify)"""
+    return dict(current_snapshot().details.get(idx).details)
 
 
-def find_nearest_by_dimension(current_idx, dimension, k=5):
+def detail_response(payload, cache_control):
+    """Serve a cached detail payload's bytes, answering If-None-Match with 304"""
+    response = Response(payload.body, mimetype='application/json')
+    response.set_etag(payload.etag)
+    response.headers['Cache-Control'] = cache_control
+    return response.make_conditional(request)
+
+
+def find_nearest_by_dimension(current_idx, dimension, k=5, facet_weights=None):
     """
     Find nearest artworks along a specific dimension.
     
@@ -112,75 +155,12 @@ def find_nearest_by_dimension(current_idx, dimension, k=5):
     - 'era': Similar time period
     - 'department': Same department
     - 'gender': Same gender
-    """
-    current_artwork = artworks[current_idx]
-    current_emb = embeddings[current_idx]
     
-    candidates = []
-    
-    for idx in range(len(artworks)):
-        if idx == current_idx:
-            continue
-        
-        artwork = artworks[idx]
-        
-        # Filter by dimension
-        if dimension == 'nationality':
-            # Check if same nationality
-            curr_nat = None
-            if current_artwork.get('ConstituentID'):
-                const_ids = current_artwork['ConstituentID']
-                if isinstance(const_ids, list) and const_ids:
-                    artist_id = const_ids[0]
-                    if artist_id in artists:
-                        curr_nat = artists[artist_id].get('Nationality')
-            
-            art_nat = None
-            if artwork.get('ConstituentID'):
-                const_ids = artwork['ConstituentID']
-                if isinstance(const_ids, list) and const_ids:
-                    artist_id = const_ids[0]
-                    if artist_id in artists:
-                        art_nat = artists[artist_id].get('Nationality')
-            
-            if not curr_nat or not art_nat or curr_nat != art_nat:
-                continue
-        
-        elif dimension == 'medium':
-            if artwork.get('Medium') != current_artwork.get('Medium'):
-                continue
-        
-        elif dimension == 'department':
-            if artwork.get('Department') != current_artwork.get('Department'):
-                continue
-        
-        elif dimension == 'gender':
-            curr_gender = None
-            if current_artwork.get('ConstituentID'):
-                const_ids = current_artwork['ConstituentID']
-                if isinstance(const_ids, list) and const_ids:
-                    artist_id = const_ids[0]
-                    if artist_id in artists:
-                        curr_gender = artists[artist_id].get('Gender')
-            
-            art_gender = None
-            if artwork.get('ConstituentID'):
-                const_ids = artwork['ConstituentID']
-                if isinstance(const_ids, list) and const_ids:
-                    artist_id = const_ids[0]
-                    if artist_id in artists:
-                        art_gender = artists[artist_id].get('Gender')
-            
-            if not curr_gender or not art_gender or curr_gender != art_gender:
-                continue
-        
-        # Compute similarity
-        sim = cosine_similarity([current_emb], [embeddings[idx]])[0][0]
-        candidates.append((idx, float(sim)))
-    
-    # Sort by similarity and return top k
-    candidates.sort(key=lambda x: x[1], reverse=True)
-    return candidates[:k]
+    Candidates are filtered by the dimension inside each search shard and
+    ranked by cosine similarity (see search.py). facet_weights, e.g.
+    {'who': 0, 'how': 1}, re-weights what "similar" means (see facets.py).
+    """
+    return current_snapshot().search.nearest(current_idx, dimension, k, facet_weights)
 
 
 def generate_latent_space_visualization(artwork_details, artwork_idx):
@@ -190,7 +170,8 @@ def generate_latent_space_visualization(artwork_details, artwork_idx):
     """
     try:
         # Get the embedding for this artwork
-        embedding = embeddings[artwork_idx].tolist()
+        snap = current_snapshot()
+        embedding = snap.embeddings[artwork_idx].tolist()
         
         # Return the raw embedding data as JSON
         # Frontend will render it quickly with Canvas/SVG
@@ -198,35 +179,61 @@ def generate_latent_space_visualization(artwork_details, artwork_idx):
             'type': 'latent_data',
             'embedding': embedding,
             'index': artwork_idx,
+            'snapshot_version': snap.version,
             'title': artwork_details['title'],
             'artist': artwork_details['artist']
         }
     
-    except Exception as e:
-        print(f"[ERROR] Failed to get latent space data: {e}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        log.exception("Failed to get latent space data", extra={'fields': {'idx': artwork_idx}})
         return None
 
 
+_matplotlib = None
+
+
+def matplotlib_api():
+    """
+    (Figure, FigureCanvasAgg, colormaps), imported on first use rather than at
+    startup, where matplotlib's font cache scan dominated cold start. None if
+    matplotlib isn't installed.
+    """
+    global _matplotlib
+    if _matplotlib is None:
+        try:
+            from matplotlib import colormaps
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            from matplotlib.figure import Figure
+            _matplotlib = (Figure, FigureCanvasAgg, colormaps)
+        except ImportError:
+            log.warning("matplotlib not available for GAN-style visualizations")
+            _matplotlib = False
+    return _matplotlib or None
+
+
 def generate_gan_from_latent(artwork_details, artwork_idx):
     """
     Generate an abstract visualization from the latent vector itself.
     This mimics what Anadol does - pure latent space generation.
     Returns a data URL with generated abstract art.
     """
-    print(f"[DEBUG] Generating GAN-style visualization from latent vector...")
+    log.debug("Generating GAN-style visualization", extra={'fields': {'idx': artwork_idx}})
     
     try:
         # Get the embedding for this artwork
-        embedding = embeddings[artwork_idx]
-        
-        if not VISUALIZATION_AVAILABLE:
-            return None
+        embedding = np.asarray(current_snapshot().embeddings[artwork_idx])
         
         # Create abstract "machine art" from the latent vector
         # This is what StyleGAN-style models actually output
-        fig = plt.figure(figsize=(8, 8), facecolor='#0a0a0f')
+        mpl = matplotlib_api()
+        if mpl is None:
+            return None
+        Figure, FigureCanvasAgg, colormaps = mpl
+        
+        # A standalone figure rather than pyplot's global "current figure",
+        # which isn't safe with renders running on stream_pool threads
+        fig = Figure(figsize=(8, 8), facecolor='#0a0a0f')
+        FigureCanvasAgg(fig)
         ax = fig.add_subplot(111)
         ax.set_facecolor('#0a0a0f')
         ax.axis('off')
@@ -247,7 +254,7 @@ def generate_gan_from_latent(artwork_details, artwork_idx):
             y = r_norm * np.sin(theta + offset)
             
             # Color based on embedding values
-            colors = plt.cm.viridis(np.linspace(0, 1, len(embedding)))
+            colors = colormaps['viridis'](np.linspace(0, 1, len(embedding)))
             
             # Draw flowing lines
             for j in range(len(embedding)-1):
@@ -268,22 +275,38 @@ def generate_gan_from_latent(artwork_details, artwork_idx):
         
         # Save to base64
         buffer = io.BytesIO()
-        plt.savefig(buffer, format='png', facecolor='#0a0a0f', 
-                   edgecolor='none', bbox_inches='tight', dpi=150, pad_inches=0)
+        fig.savefig(buffer, format='png', facecolor='#0a0a0f', 
+                    edgecolor='none', bbox_inches='tight', dpi=150, pad_inches=0)
         buffer.seek(0)
         image_base64 = base64.b64encode(buffer.read()).decode()
-        plt.close(fig)
         
-        print(f"[SUCCESS] Generated GAN-style visualization from latent vector")
         return f"data:image/png;base64,{image_base64}"
     
-    except Exception as e:
-        print(f"[ERROR] Failed to generate GAN visualization: {e}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        log.exception("Failed to generate GAN visualization", extra={'fields': {'idx': artwork_idx}})
         return None
 
 
+def build_prompt(artwork_details):
+    """Text prompt sent to the text-to-image model (mirrored in main.js)"""
+    prompt = f"An artwork titled '{artwork_details['title']}' by {artwork_details['artist']}"
+    
+    if artwork_details.get('nationality') and artwork_details['nationality'] != 'Unknown':
+        prompt += f" ({artwork_details['nationality']} artist)"
+    
+    if artwork_details.get('date') and artwork_details['date'] != 'Unknown':
+        prompt += f", created in {artwork_details['date']}"
+    
+    if artwork_details.get('medium') and artwork_details['medium'] != 'Unknown':
+        prompt += f", using {artwork_details['medium']}"
+    
+    if artwork_details.get('classification') and artwork_details['classification'] != 'Unknown':
+        prompt += f", classified as {artwork_details['classification']}"
+    
+    prompt += ". Museum quality, high resolution, professional photography."
+    return prompt
+
+
 def generate_artwork_image(artwork_details, use_ai=True):
     """
     Generate an image from artwork metadata.
@@ -292,76 +315,46 @@ def generate_artwork_image(artwork_details, use_ai=True):
         artwork_details: Artwork metadata dict
         use_ai: If True, try Replicate AI. If False, use latent space viz only.
     """
+    # Check cache (indices only mean something within one snapshot, so it lives on the snapshot)
+    artwork_idx = artwork_details['index']
+    generated_images = current_snapshot().generated_images
+    fields = {'idx': artwork_idx, 'use_ai': use_ai}
     
-    print("\n" + "="*70)
-    print("GENERATE_ARTWORK_IMAGE DEBUG")
-    print("="*70)
-    
-    # Check cache
-    cache_key = artwork_details['index']
-    print(f"[DEBUG] Cache key: {cache_key}")
-    if cache_key in generated_images:
-        cached_value = generated_images[cache_key]
-        print(f"[DEBUG] Found in cache, type: {type(cached_value)}")
+    if artwork_idx in generated_images:
+        count('cache_lookups_total', cache='generated_images', result='hit')
+        cached_value = generated_images[artwork_idx]
         
         # Handle different cached value types
         if isinstance(cached_value, dict):
             # It's latent data - return as is
-            print(f"[DEBUG] Returning cached latent data")
             return cached_value
         elif hasattr(cached_value, 'url'):
             # Convert FileOutput to string
             cached_value = str(cached_value.url)
-            generated_images[cache_key] = cached_value
-            print(f"[DEBUG] Converted cached FileOutput to URL: {cached_value}")
+            generated_images[artwork_idx] = cached_value
         elif not isinstance(cached_value, str):
             # Convert to string
             cached_value = str(cached_value)
-            generated_images[cache_key] = cached_value
-            print(f"[DEBUG] Converted cached value to string: {cached_value}")
+            generated_images[artwork_idx] = cached_value
         
-        print(f"[DEBUG] Returning cached value")
+        log.debug("Returning cached image", extra={'fields': fields})
         return cached_value
     
     # Try latent space visualization first (free and conceptually aligned)
     if not use_ai:
-        print(f"[DEBUG] Generating latent space data (no AI)...")
-        viz_data = generate_latent_space_visualization(artwork_details, cache_key)
+        viz_data = generate_latent_space_visualization(artwork_details, artwork_idx)
         if viz_data:
-            # Don't cache - generate fresh each time (it's fast)
-            print(f"[SUCCESS] Generated latent space data: {type(viz_data)}")
-            print("="*70 + "\n")
+            # Don't cache - generate fresh each time (it's fast), so not a miss either
             return viz_data
+    count('cache_lookups_total', cache='generated_images', result='miss')
     
     # Create prompt from metadata
-    prompt = f"An artwork titled '{artwork_details['title']}' by {artwork_details['artist']}"
-    
-    if artwork_details.get('nationality') and artwork_details['nationality'] != 'Unknown':
-        prompt += f" ({artwork_details['nationality']} artist)"
-    
-    if artwork_details.get('date') and artwork_details['date'] != 'Unknown':
-        prompt += f", created in {artwork_details['date']}"
-    
-    if artwork_details.get('medium') and artwork_details['medium'] != 'Unknown':
-        prompt += f", using {artwork_details['medium']}"
-    
-    if artwork_details.get('classification') and artwork_details['classification'] != 'Unknown':
-        prompt += f", classified as {artwork_details['classification']}"
-    
-    prompt += ". Museum quality, high resolution, professional photography."
-    
-    print(f"[DEBUG] Full prompt: {prompt}")
-    print(f"[DEBUG] Prompt length: {len(prompt)} characters")
+    prompt = build_prompt(artwork_details)
+    log.debug("Built prompt: %s", prompt, extra={'fields': fields})
     
     try:
-        # Check if API token is available
-        print(f"[DEBUG] Checking API token...")
-        print(f"[DEBUG] Token exists: {bool(REPLICATE_API_TOKEN)}")
-        if REPLICATE_API_TOKEN:
-            print(f"[DEBUG] Token prefix: {REPLICATE_API_TOKEN[:10]}...")
-        
-        if not REPLICATE_API_TOKEN:
-            print("[ERROR] No Replicate API token configured")
+        if not generator.available:
+            log.error("No Replicate API token configured", extra={'fields': fields})
             return None
         
         # TEXT-TO-IMAGE MODEL OPTIONS
@@ -395,223 +388,418 @@ def generate_artwork_image(artwork_details, use_ai=True):
         #     "height": 1024
         # }
         
-        print(f"[DEBUG] Calling replicate.run()...")
-        print(f"[DEBUG] Model: {model}")
-        print(f"[DEBUG] Input parameters: {model_input}")
-        
-        output = replicate.run(model, input=model_input)
-        
-        print(f"[DEBUG] replicate.run() completed successfully")
-        print(f"[DEBUG] Output type: {type(output)}")
-        print(f"[DEBUG] Output repr: {repr(output)}")
+        log.debug("Calling generator", extra={'fields': {**fields, 'model': model, 'backend': generator.name}})
+        with timed('remote_call'):
+            output = generator.run(model, model_input)
         
         # Get the image URL - Replicate can return different types
-        raw_output = None
         if isinstance(output, list) and len(output) > 0:
             raw_output = output[0]
-            print(f"[DEBUG] Extracted from list, type: {type(raw_output)}")
         else:
             raw_output = output
-            print(f"[DEBUG] Using output directly, type: {type(raw_output)}")
         
         # Convert FileOutput or other objects to string URL
-        image_url = None
         if hasattr(raw_output, 'url'):
             # FileOutput object has a .url attribute
             image_url = str(raw_output.url)
-            print(f"[DEBUG] Extracted URL from FileOutput.url: {image_url}")
         elif isinstance(raw_output, str):
             image_url = raw_output
-            print(f"[DEBUG] Already a string: {image_url}")
         else:
             # Try to convert to string directly
             image_url = str(raw_output)
-            print(f"[DEBUG] Converted to string: {image_url}")
-        
-        # Ensure we have a valid string
-        if not isinstance(image_url, str):
-            print(f"[ERROR] image_url is not a string: {type(image_url)}")
-            return None
         
         # Cache the string URL
-        generated_images[cache_key] = image_url
-        print(f"[DEBUG] Cached image URL (string) for key {cache_key}")
-        
-        print(f"[SUCCESS] Generated image URL: {image_url}")
-        print("="*70 + "\n")
+        generated_images[artwork_idx] = image_url
+        log.info("Generated image", extra={'fields': {**fields, 'model': model}})
         return image_url
     
     except Exception as e:
-        print(f"[ERROR] Exception occurred: {type(e).__name__}")
-        print(f"[ERROR] Error message: {e}")
-        print(f"[ERROR] Full traceback:")
-        import traceback
-        traceback.print_exc()
-        
         # Check if it's an insufficient credit error - use latent space viz as fallback
         if "Insufficient credit" in str(e) or "402" in str(e):
-            print("[INFO] Insufficient Replicate credits. Falling back to latent space data.")
-            viz_data = generate_latent_space_visualization(artwork_details, cache_key)
+            log.warning("Insufficient Replicate credits, falling back to latent space data",
+                        extra={'fields': fields})
+            viz_data = generate_latent_space_visualization(artwork_details, artwork_idx)
             if viz_data:
-                print(f"[SUCCESS] Generated latent space data as fallback: {type(viz_data)}")
-                print("="*70 + "\n")
                 return viz_data
-        
-        print("="*70 + "\n")
+        else:
+            log.exception("Image generation failed", extra={'fields': fields})
         return None
 
 
 @app.route('/')
 def index():
     """Main page"""
+    snap = current_snapshot()
     return render_template('index.html', 
-                         total_artworks=len(artworks),
-                         metadata=metadata)
+                         total_artworks=len(snap),
+                         metadata=snap.metadata)
+
+
+def _sampling_params():
+    """
+    Sampling options from the query string (see sampling.py):
+    by=<column>, mode=uniform|stratified|inverse|weights, strength=<0..1>,
+    weights=label:w,..., unknown=1 to include 'Unknown', seed=<int>
+    """
+    args = request.args
+    weights = parse_weights(args['weights']) if args.get('weights') else None
+    try:
+        strength = float(args.get('strength', 0.5))
+        seed = int(args['seed']) if args.get('seed') else None
+    except ValueError:
+        raise ValueError('strength must be a number and seed an integer')
+    return {
+        'column': args.get('by'),
+        'mode': args.get('mode') or ('weights' if weights else 'stratified' if args.get('by') else 'uniform'),
+        'strength': strength,
+        'weights': weights,
+        'include_unknown': args.get('unknown') == '1',
+        'seed': seed,
+    }
 
 
 @app.route('/api/random')
 def random_artwork():
-    """Get a random starting artwork"""
-    idx = np.random.randint(0, len(artworks))
-    details = get_artwork_details(idx)
-    return jsonify(details)
+    """
+    Get a random starting artwork.
+
+    Uniform by default; ?by=gender (stratified) or ?by=nationality&mode=inverse
+    spread entry points beyond the collection's majority groups.
+    """
+    snap = current_snapshot()
+    try:
+        indices, _ = snap.sampler.sample(1, **_sampling_params())
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    # Same bytes as /api/artwork/<idx>, but this URL must never be cached
+    return detail_response(snap.details.get(int(indices[0])), 'no-store')
+
+
+@app.route('/api/random/batch')
+def random_batch():
+    """
+    Many random entry points at once for prefetching (?n=, plus /api/random's
+    options). Add details=1 to include each artwork's details inline.
+    """
+    snap = current_snapshot()
+    try:
+        n = int(request.args.get('n', 20))
+        indices, groups = snap.sampler.sample(n, **_sampling_params())
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    indices = [int(i) for i in indices]
+    body = json.dumps({'snapshot_version': snap.version, 'indices': indices, 'groups': groups}).encode()
+    if request.args.get('details') == '1':
+        artworks = b','.join(snap.details.get(idx).body for idx in indices)
+        body = body[:-1] + b',"artworks":[' + artworks + b']}'
+    response = Response(body, mimetype='application/json')
+    response.headers['Cache-Control'] = 'no-store'
+    return response
 
 
 @app.route('/api/artwork/<int:idx>')
 def get_artwork(idx):
-    """Get details for a specific artwork"""
-    if idx < 0 or idx >= len(artworks):
+    """
+    Get details for a specific artwork.
+
+    Pass ?v=<snapshot version> to get an immutable response; without it
+    clients revalidate with the ETag, since an index means a different work
+    after a reload.
+    """
+    snap = current_snapshot()
+    if idx < 0 or idx >= len(snap):
         return jsonify({'error': 'Invalid index'}), 400
     
-    details = get_artwork_details(idx)
-    return jsonify(details)
+    if request.args.get('v') == snap.version:
+        cache_control = f'public, max-age={DETAIL_MAX_AGE}, immutable'
+    else:
+        cache_control = 'no-cache'
+    return detail_response(snap.details.get(idx), cache_control)
 
 
 @app.route('/api/navigate', methods=['POST'])
 def navigate():
-    """Navigate from current artwork along a dimension"""
+    """Navigate from current artwork along a dimension (optionally with facet_weights)"""
     data = request.json
     current_idx = data.get('current_idx')
     dimension = data.get('dimension', 'similar')
     k = data.get('k', 5)
     
-    if current_idx is None or current_idx < 0 or current_idx >= len(artworks):
+    if current_idx is None or current_idx < 0 or current_idx >= len(current_snapshot()):
         return jsonify({'error': 'Invalid current index'}), 400
     
     # Find nearest neighbors
-    neighbors = find_nearest_by_dimension(current_idx, dimension, k)
-    
-    # Get details for each neighbor
-    results = []
-    for idx, similarity in neighbors:
-        details = get_artwork_details(idx)
-        details['similarity'] = similarity
-        results.append(details)
+    try:
+        neighbors = find_nearest_by_dimension(current_idx, dimension, k, data.get('facet_weights'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    # Splice each neighbour's cached payload in rather than re-encoding it
+    with timed('details'):
+        snap = current_snapshot()
+        results = b','.join(snap.details.get(idx).with_field('similarity', similarity)
+                            for idx, similarity in neighbors)
+        body = b'{"dimension":' + json.dumps(dimension).encode() + b',"neighbors":[' + results + b']}'
+        return Response(body, mimetype='application/json')
+
+
+def image_payload(result):
+    """Response body for a generate_artwork_image result: latent data (dict) or an image URL"""
+    if isinstance(result, dict) and result.get('type') == 'latent_data':
+        return {'latent_data': result}
+    return {'image_url': str(result)}
+
+
+def _render_pinned(snap, kind, details):
+    """One stream render on a pool thread, against the snapshot the stream started on"""
+    with app.app_context():
+        g.snapshot = snap
+        try:
+            if kind == 'gan':
+                with in_flight('generation', kind='gan'), timed('render'):
+                    image_url = generate_gan_from_latent(details, details['index'])
+                return {'image_url': image_url} if image_url else {'error': 'Failed to generate GAN visualization'}
+            with in_flight('generation', kind='ai'):
+                result = generate_artwork_image(details, use_ai=True)
+            return image_payload(result) if result else {'error': 'Failed to generate image'}
+        except Exception as e:
+            log.exception("Stream render failed", extra={'fields': {'idx': details['index'], 'kind': kind}})
+            return {'error': f'Server error: {str(e)}'}
+
+
+def _event(name, payload):
+    return json.dumps({'event': name, **payload}).encode() + b'\n'
+
+
+@app.route('/api/navigate/stream', methods=['POST'])
+def navigate_stream():
+    """
+    One navigation step over a single streamed response (NDJSON, one event per line):
+
+        artwork    - the artwork's details
+        neighbors  - one per requested dimension, as soon as its top-k is ready
+        latent     - the latent vector for the transparency view
+        gan, ai    - each render as it completes (in whichever order)
+        done
+
+    Body: {current_idx, dimensions: [...], k, generate, facet_weights}. With
+    generate false only the artwork and neighbour events are sent.
+    """
+    data = request.json or {}
+    current_idx = data.get('current_idx')
+    dimensions = data.get('dimensions') or ['similar']
+    k = data.get('k', 10)
+    generate = data.get('generate', True)
+    facet_weights = data.get('facet_weights')
     
-    return jsonify({
-        'dimension': dimension,
-        'neighbors': results
-    })
+    snap = current_snapshot()
+    if current_idx is None or current_idx < 0 or current_idx >= len(snap):
+        return jsonify({'error': 'Invalid current index'}), 400
+    # Check the request now; once streaming starts there is no status code to return
+    if (not isinstance(dimensions, list) or not dimensions
+            or not all(isinstance(d, str) for d in dimensions)):
+        return jsonify({'error': 'dimensions must be a list of dimension names'}), 400
+    if isinstance(k, bool) or not isinstance(k, int) or k <= 0:
+        return jsonify({'error': 'k must be a positive integer'}), 400
+    if facet_weights:
+        try:
+            snap.search.facet_weights(facet_weights)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+    
+    details = get_artwork_details(current_idx)
+    # Remote generation is the slow part, so it starts before anything is sent
+    renders = {}
+    if generate:
+        renders = {stream_pool.submit(_render_pinned, snap, kind, details): kind for kind in ('ai', 'gan')}
+    
+    def events():
+        start = time.perf_counter()
+        yield b'{"event":"artwork","artwork":' + snap.details.get(current_idx).body + b'}\n'
+        
+        for dimension in dimensions:
+            with timed('stream_neighbors'):
+                neighbors = find_nearest_by_dimension(current_idx, dimension, k, facet_weights)
+                results = b','.join(snap.details.get(idx).with_field('similarity', similarity)
+                                    for idx, similarity in neighbors)
+            yield (b'{"event":"neighbors","dimension":' + json.dumps(dimension).encode()
+                   + b',"neighbors":[' + results + b']}\n')
+        
+        if generate:
+            latent = generate_latent_space_visualization(details, current_idx)
+            yield _event('latent', {'latent_data': latent} if latent else {'error': 'Failed to get latent data'})
+            for future in as_completed(renders):
+                yield _event(renders[future], future.result())
+        
+        yield _event('done', {'elapsed_s': round(time.perf_counter() - start, 3)})
+    
+    response = Response(stream_with_context(events()), mimetype='application/x-ndjson')
+    response.headers['Cache-Control'] = 'no-store'
+    response.headers['X-Accel-Buffering'] = 'no'  # Let proxies pass each line through at once
+    return response
 
 
 @app.route('/api/generate', methods=['POST'])
 def generate():
     """Generate an image for an artwork"""
-    print("\n" + "="*70)
-    print("/API/GENERATE ENDPOINT CALLED")
-    print("="*70)
-    
     try:
         data = request.json
-        print(f"[DEBUG] Request data: {data}")
-        
         idx = data.get('idx')
         use_ai = data.get('use_ai', True)  # Default to AI if not specified
-        print(f"[DEBUG] Artwork index: {idx}")
-        print(f"[DEBUG] Use AI: {use_ai}")
         
-        if idx is None or idx < 0 or idx >= len(artworks):
-            print(f"[ERROR] Invalid index: {idx} (must be 0-{len(artworks)-1})")
+        n_artworks = len(current_snapshot())
+        if idx is None or idx < 0 or idx >= n_artworks:
+            log.debug("Invalid index %s (must be 0-%d)", idx, n_artworks - 1)
             return jsonify({'error': 'Invalid index'}), 400
         
-        print(f"[DEBUG] Getting artwork details for index {idx}...")
         details = get_artwork_details(idx)
-        print(f"[DEBUG] Artwork details: {details.get('title')} by {details.get('artist')}")
-        
-        print(f"[DEBUG] Calling generate_artwork_image()...")
-        result = generate_artwork_image(details, use_ai=use_ai)
+        with in_flight('generation', kind='ai' if use_ai else 'latent'):
+            result = generate_artwork_image(details, use_ai=use_ai)
         
         if result:
-            print(f"[SUCCESS] Image generated successfully")
-            
-            # Check if it's latent data (dict) or URL (string)
-            if isinstance(result, dict) and result.get('type') == 'latent_data':
-                print(f"[DEBUG] Generated latent data structure")
-                print("="*70 + "\n")
-                return jsonify({'latent_data': result})
-            else:
-                # It's a URL string
-                result_str = str(result)
-                if result_str.startswith('data:'):
-                    print(f"[DEBUG] Generated base64 image")
-                else:
-                    print(f"[DEBUG] Generated URL: {result_str[:100]}...")
-                print("="*70 + "\n")
-                return jsonify({'image_url': result_str})
+            return jsonify(image_payload(result))
         else:
-            print(f"[ERROR] generate_artwork_image() returned None")
-            print("="*70 + "\n")
             return jsonify({'error': 'Failed to generate image. Check server logs for details.'}), 500
     except Exception as e:
-        print(f"[ERROR] Exception in /api/generate endpoint: {type(e).__name__}")
-        print(f"[ERROR] Error message: {e}")
-        import traceback
-        traceback.print_exc()
-        print("="*70 + "\n")
+        log.exception("Unhandled error in /api/generate")
         return jsonify({'error': f'Server error: {str(e)}'}), 500
 
 
 @app.route('/api/generate-gan', methods=['POST'])
 def generate_gan():
     """Generate GAN-style visualization from latent vector"""
-    print("\n" + "="*70)
-    print("/API/GENERATE-GAN ENDPOINT CALLED")
-    print("="*70)
-    
     try:
         data = request.json
         idx = data.get('idx')
         
-        print(f"[DEBUG] Artwork index: {idx}")
-        
-        if idx is None or idx < 0 or idx >= len(artworks):
-            print(f"[ERROR] Invalid index: {idx}")
+        if idx is None or idx < 0 or idx >= len(current_snapshot()):
+            log.debug("Invalid index %s", idx)
             return jsonify({'error': 'Invalid index'}), 400
         
-        print(f"[DEBUG] Getting artwork details...")
         details = get_artwork_details(idx)
-        
-        print(f"[DEBUG] Generating GAN visualization from latent vector...")
-        image_url = generate_gan_from_latent(details, idx)
+        with in_flight('generation', kind='gan'), timed('render'):
+            image_url = generate_gan_from_latent(details, idx)
         
         if image_url:
-            print(f"[SUCCESS] Generated GAN visualization")
-            print("="*70 + "\n")
             return jsonify({'image_url': image_url})
         else:
-            print(f"[ERROR] Failed to generate GAN visualization")
-            print("="*70 + "\n")
             return jsonify({'error': 'Failed to generate GAN visualization'}), 500
             
     except Exception as e:
-        print(f"[ERROR] Exception in /api/generate-gan: {type(e).__name__}")
-        print(f"[ERROR] Error message: {e}")
-        import traceback
-        traceback.print_exc()
-        print("="*70 + "\n")
+        log.exception("Unhandled error in /api/generate-gan")
         return jsonify({'error': f'Server error: {str(e)}'}), 500
 
 
+@app.route('/api/tiles/index.json')
+def tile_index():
+    """Manifest for the collection map tile pyramid of the current snapshot"""
+    snap = current_snapshot()
+    index_path = snap.tiles_dir / 'index.json'
+    if not index_path.exists():
+        return jsonify({'error': 'Map tiles not built. Run tiles.py'}), 404
+    with open(index_path, 'r') as f:
+        manifest = json.load(f)
+    manifest['version'] = snap.version
+    manifest['tiles_version'] = tiles_version(snap.tiles_dir)
+    return jsonify(manifest)
+
+
+@app.route('/api/tiles/<version>/<int:z>/<int:x>/<int:y>.bin')
+def tile(version, z, x, y):
+    """One quadtree tile of packed point records (see tiles.TILE_DTYPE)"""
+    snap = current_snapshot()
+    if version != tiles_version(snap.tiles_dir):
+        return jsonify({'error': 'Unknown tiles version'}), 404
+    n = 1 << min(z, 30)
+    if z < 0 or z > 30 or x < 0 or y < 0 or x >= n or y >= n:
+        return jsonify({'error': 'Invalid tile'}), 400
+    
+    tile_path = snap.tiles_dir / str(z) / str(x) / f'{y}.bin'
+    if not tile_path.exists():
+        # Empty region - cache the empty answer just as long as a real tile
+        response = make_response(b'')
+        response.mimetype = 'application/octet-stream'
+        response.cache_control.public = True
+        response.cache_control.max_age = TILE_MAX_AGE
+        return response
+    
+    response = send_file(tile_path, mimetype='application/octet-stream',
+                         max_age=TILE_MAX_AGE, conditional=True)
+    response.cache_control.public = True
+    return response
+
+
+def _export_selection(n_rows):
+    """Rows requested via ?start=&stop=, ?ids=1,2,3 or a JSON body {"ids": [...]}"""
+    ids = None
+    if request.method == 'POST':
+        body = request.get_json(silent=True)
+        if body is not None and not isinstance(body, dict):
+            raise ValueError('body must be a JSON object like {"ids": [...]}')
+        ids = (body or {}).get('ids')
+        if ids is not None and not isinstance(ids, list):
+            raise ValueError('ids must be a list of integers')
+    elif request.args.get('ids'):
+        try:
+            ids = [int(i) for i in request.args['ids'].split(',') if i.strip()]
+        except ValueError:
+            raise ValueError('ids must be a comma-separated list of integers')
+    try:
+        start = int(request.args['start']) if 'start' in request.args else None
+        stop = int(request.args['stop']) if 'stop' in request.args else None
+    except ValueError:
+        raise ValueError('start and stop must be integers')
+    return parse_rows(n_rows, start, stop, ids)
+
+
+def _npy_response(chunks, n_rows, filename):
+    response = Response(chunks, mimetype='application/octet-stream')
+    response.headers['Content-Disposition'] = f'attachment; filename={filename}'
+    response.headers['X-Row-Count'] = str(n_rows)
+    return response
+
+
+@app.route('/api/export/embeddings.npy', methods=['GET', 'POST'])
+def export_embeddings():
+    """Stream a slice of the embedding matrix as a little-endian .npy file"""
+    dtype_name = request.args.get('dtype', 'float32')
+    if dtype_name not in EXPORT_DTYPES:
+        return jsonify({'error': f'dtype must be one of {sorted(EXPORT_DTYPES)}'}), 400
+    
+    embeddings = current_snapshot().embeddings
+    try:
+        rows = _export_selection(len(embeddings))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    chunks = iter_npy(embeddings, rows, EXPORT_DTYPES[dtype_name])
+    return _npy_response(chunks, selection_length(rows), 'embeddings.npy')
+
+
+@app.route('/api/export/columns')
+def export_column_labels():
+    """Label tables for the coded metadata columns (labels[code] = value)"""
+    columns = current_snapshot().columns
+    return jsonify({name: col['labels'] for name, col in columns.items()})
+
+
+@app.route('/api/export/columns/<name>.npy', methods=['GET', 'POST'])
+def export_column(name):
+    """Stream a slice of one coded metadata column as a little-endian .npy file"""
+    columns = current_snapshot().columns
+    if name not in columns:
+        return jsonify({'error': f'Unknown column. Choose from {sorted(columns)}'}), 404
+    
+    codes = columns[name]['codes']
+    try:
+        rows = _export_selection(len(codes))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return _npy_response(iter_npy(codes, rows), selection_length(rows), f'{name}.npy')
+
+
 @app.route('/api/test-replicate')
 def test_replicate():
     """Test if Replicate API is working"""
@@ -634,6 +822,89 @@ def test_replicate():
         }), 500
 
 
+@app.route('/ready')
+def ready():
+    """Readiness probe: 503 until a snapshot is loaded, with the startup profile"""
+    snap = snapshots.current
+    response = jsonify({
+        'ready': snap is not None,
+        'status': snapshots.status,
+        'startup': {
+            'imports': profile.report(),
+            'snapshot': snap.load_profile.report() if snap else None,
+        },
+    })
+    response.status_code = 200 if snap is not None else 503
+    return response
+
+
+@app.route('/metrics')
+def metrics():
+    """Latency histograms, cache hit ratios and in-flight generations (Prometheus text, or ?format=json)"""
+    if request.args.get('format') == 'json':
+        return jsonify(registry.summary())
+    return Response(registry.prometheus(), mimetype='text/plain; version=0.0.4')
+
+
+@app.route('/api/snapshot')
+def snapshot_status():
+    """Version being served and the state of any background reload"""
+    snap = current_snapshot()
+    return jsonify({
+        'version': snap.version,
+        'n_artworks': len(snap),
+        'loaded_at': snap.loaded_at,
+        'facets': snap.facet_info,
+        'reload': snapshots.status
+    })
+
+
+@app.route('/api/snapshot/reload', methods=['POST'])
+def reload_snapshot():
+    """Load the published (or a named) snapshot in the background and switch to it"""
+    if request.remote_addr not in ('127.0.0.1', '::1'):
+        return jsonify({'error': 'Reload is only allowed from localhost'}), 403
+    
+    version = (request.get_json(silent=True) or {}).get('version')
+    if version is not None and (not isinstance(version, str) or '/' in version or version.startswith('.')):
+        return jsonify({'error': 'Invalid version'}), 400
+    
+    if not snapshots.reload(version):
+        return jsonify({'error': 'A reload is already in progress', 'reload': snapshots.status}), 409
+    return jsonify({'status': 'loading', 'reload': snapshots.status}), 202
+
+
+@app.route('/api/density')
+def density_summary():
+    """Per-group representation density and isolation scores (see density.py)"""
+    snap = current_snapshot()
+    if snap.density is None:
+        return jsonify({'error': 'Density analysis not run. Run density.py'}), 404
+    return jsonify(snap.density)
+
+
+@app.route('/api/density/<int:idx>')
+def artwork_density(idx):
+    """Who lives in one artwork's neighbourhood, by gender and nationality"""
+    snap = current_snapshot()
+    if snap.density is None:
+        return jsonify({'error': 'Density analysis not run. Run density.py'}), 404
+    if idx < 0 or idx >= len(snap):
+        return jsonify({'error': 'Invalid index'}), 400
+    
+    neighbours = snap.density_arrays['knn'][idx]
+    result = {'index': idx, 'k': snap.density['k'], 'neighbours': neighbours.tolist()}
+    for name in snap.density['columns']:
+        codes, labels = snap.columns[name]['codes'], snap.columns[name]['labels']
+        counts = np.bincount(codes[neighbours], minlength=len(labels))
+        result[name] = {
+            'own': labels[codes[idx]],
+            'same_fraction': float(snap.density_arrays[f'same_{name}'][idx]),
+            'composition': {labels[c]: int(counts[c]) for c in np.flatnonzero(counts)}
+        }
+    return jsonify(result)
+
+
 @app.route('/api/stats', methods=['POST'])
 def get_stats():
     """Get statistics for a path through the collection"""
@@ -649,6 +920,9 @@ def get_stats():
     departments = {}
     decades = {}
     
+    snap = current_snapshot()
+    artworks, artists = snap.artworks, snap.artists
+    
     for idx in path_indices:
         if idx < 0 or idx >= len(artworks):
             continue
@@ -661,14 +935,14 @@ def get_stats():
             if isinstance(const_ids, list) and const_ids:
                 artist_id = const_ids[0]
                 if artist_id in artists:
-                    nat = artists[artist_id].get('Nationality', 'Unknown')
+                    nat = artists[artist_id].get('Nationality') or 'Unknown'
                     nationalities[nat] = nationalities.get(nat, 0) + 1
                     
-                    gender = artists[artist_id].get('Gender', 'Unknown')
+                    gender = artists[artist_id].get('Gender') or 'Unknown'
                     genders[gender] = genders.get(gender, 0) + 1
         
         # Department
-        dept = artwork.get('Department', 'Unknown')
+        dept = artwork.get('Department') or 'Unknown'
         departments[dept] = departments.get(dept, 0) + 1
         
         # Decade (from date acquired)
@@ -706,7 +980,10 @@ if __name__ == '__main__':
     print("A Counterfactual Exploration of MoMA's Archive")
     print("=" * 70)
     print()
-    print(f"Loaded {len(artworks):,} artworks in latent space")
+    if snapshots.ready:
+        print(f"Loaded {len(snapshots.current):,} artworks in latent space")
+    else:
+        print(f"Latent space: {snapshots.status['state']} in the background (see /ready)")
     print()
     print("Starting server...")
     print("Open: http://localhost:5001")
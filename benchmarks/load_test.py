@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Load Test
+
+Replays browse sessions against a running app at increasing concurrency and
+reports throughput and tail latency per level. Each simulated visitor does
+what the web UI does:
+
+    /api/random -> (/api/navigate -> /api/generate) x steps -> /api/stats
+
+Point it at a server with --url, or let it start one from a synthetic
+collection (see synthetic.py) with GENERATOR_BACKEND=fake, so generation
+costs a configurable sleep instead of Replicate credits (see generators.py).
+
+Usage:
+    ./venv/bin/python benchmarks/load_test.py --rows 160k --concurrency 1,4,16,64
+    ./venv/bin/python benchmarks/load_test.py --url http://127.0.0.1:5001 --duration 30
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import numpy as np
+from pathlib import Path
+from urllib.parse import urlsplit
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from run_benchmarks import parse_size, run_info
+
+DIMENSIONS = ['similar', 'nationality', 'gender', 'medium', 'department', 'era']
+
+
+class Client:
+    """One keep-alive connection per simulated visitor"""
+
+    def __init__(self, base_url, timeout=60):
+        parts = urlsplit(base_url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.timeout = timeout
+        self.conn = None
+
+    def request(self, method, path, payload=None):
+        body = json.dumps(payload) if payload is not None else None
+        headers = {'Content-Type': 'application/json'} if body else {}
+        for attempt in range(2):
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            try:
+                self.conn.request(method, path, body=body, headers=headers)
+                response = self.conn.getresponse()
+                data = response.read()
+                if response.getheader('Connection', '').lower() == 'close':
+                    self.close()
+                return response.status, data
+            except (http.client.HTTPException, OSError):
+                self.close()
+                if attempt:
+                    raise
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+class Recorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = {}
+        self.errors = {}
+        self.sessions = 0
+
+    def record(self, endpoint, seconds, ok):
+        with self._lock:
+            self.latencies.setdefault(endpoint, []).append(seconds)
+            if not ok:
+                self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+    def session_done(self):
+        with self._lock:
+            self.sessions += 1
+
+
+def timed_call(client, recorder, endpoint, method, path, payload=None):
+    start = time.perf_counter()
+    try:
+        status, data = client.request(method, path, payload)
+    except (http.client.HTTPException, OSError):
+        recorder.record(endpoint, time.perf_counter() - start, ok=False)
+        return None
+    recorder.record(endpoint, time.perf_counter() - start, ok=status < 400)
+    if status >= 400:
+        return None
+    try:
+        return json.loads(data)
+    except ValueError:
+        return None
+
+
+def browse_session(client, recorder, rng, steps, ai_share, think_time):
+    """One visitor's walk through the latent space"""
+    current = timed_call(client, recorder, 'random', 'GET', '/api/random')
+    if current is None:
+        return
+    path = [current['index']]
+
+    for _ in range(steps):
+        time.sleep(think_time)
+        neighbours = timed_call(client, recorder, 'navigate', 'POST', '/api/navigate',
+                                {'current_idx': current['index'], 'dimension': rng.choice(DIMENSIONS), 'k': 5})
+        if not neighbours or not neighbours.get('neighbors'):
+            break
+        current = rng.choice(neighbours['neighbors'])
+        path.append(current['index'])
+        timed_call(client, recorder, 'generate', 'POST', '/api/generate',
+                   {'idx': current['index'], 'use_ai': rng.random() < ai_share})
+
+    timed_call(client, recorder, 'stats', 'POST', '/api/stats', {'path': path})
+    recorder.session_done()
+
+
+def run_level(base_url, concurrency, duration, steps, ai_share, think_time, seed):
+    recorder = Recorder()
+    deadline = time.perf_counter() + duration
+
+    def visitor(i):
+        client = Client(base_url)
+        rng = random.Random(seed * 10_000 + i)
+        try:
+            while time.perf_counter() < deadline:
+                browse_session(client, recorder, rng, steps, ai_share, think_time)
+        finally:
+            client.close()
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=visitor, args=(i,), daemon=True) for i in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    def summarize(seconds, errors):
+        ms = np.array(seconds) * 1000
+        return {'requests': len(ms), 'errors': errors, 'rps': len(ms) / elapsed,
+                'p50_ms': float(np.percentile(ms, 50)), 'p95_ms': float(np.percentile(ms, 95)),
+                'p99_ms': float(np.percentile(ms, 99)), 'max_ms': float(ms.max())}
+
+    everything = [s for seconds in recorder.latencies.values() for s in seconds]
+    if not everything:
+        return {'concurrency': concurrency, 'elapsed_s': elapsed, 'sessions': 0, 'requests': 0}
+    return {
+        'concurrency': concurrency,
+        'elapsed_s': elapsed,
+        'sessions': recorder.sessions,
+        'sessions_per_s': recorder.sessions / elapsed,
+        **summarize(everything, sum(recorder.errors.values())),
+        'endpoints': {endpoint: summarize(seconds, recorder.errors.get(endpoint, 0))
+                      for endpoint, seconds in sorted(recorder.latencies.items())},
+    }
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(data_root, args):
+    """Run the app from data_root with the fake generator backend; returns (process, url)"""
+    port = free_port()
+    env = dict(os.environ,
+               GENERATOR_BACKEND='fake',
+               FAKE_LATENCY_MS=str(args.fake_latency_ms),
+               FAKE_JITTER_MS=str(args.fake_jitter_ms),
+               FAKE_ERROR_RATE=str(args.fake_error_rate),
+               FAKE_CREDIT_ERROR_RATE=str(args.fake_credit_error_rate),
+               LOG_LEVEL=os.getenv('LOG_LEVEL', 'WARNING'))
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'flask', '--app', str(REPO_ROOT / 'app.py'), 'run',
+         '--host', '127.0.0.1', '--port', str(port), '--with-threads'],
+        cwd=data_root, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    url = f'http://127.0.0.1:{port}'
+    client = Client(url, timeout=5)
+    deadline = time.time() + args.startup_timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'App exited with code {process.returncode} during startup')
+        try:
+            if client.request('GET', '/ready')[0] == 200:
+                client.close()
+                return process, url
+        except (http.client.HTTPException, OSError):
+            pass
+        time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError(f'App did not become ready within {args.startup_timeout}s')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', help='Test an already running app instead of starting one')
+    parser.add_argument('--rows', default='160k', help='Synthetic collection size when starting the app')
+    parser.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), 'anadol-bench'),
+                        help='Where synthetic collections are generated and reused')
+    parser.add_argument('--concurrency', default='1,2,4,8,16,32', help='Comma-separated visitor counts')
+    parser.add_argument('--duration', type=float, default=20, help='Seconds per concurrency level')
+    parser.add_argument('--steps', type=int, default=5, help='Navigation steps per session')
+    parser.add_argument('--ai-share', type=float, default=0.5,
+                        help='Fraction of generate calls that ask for an AI image')
+    parser.add_argument('--think-time', type=float, default=0.0, help='Seconds between steps')
+    parser.add_argument('--fake-latency-ms', type=float, default=1500)
+    parser.add_argument('--fake-jitter-ms', type=float, default=500)
+    parser.add_argument('--fake-error-rate', type=float, default=0.0)
+    parser.add_argument('--fake-credit-error-rate', type=float, default=0.0)
+    parser.add_argument('--startup-timeout', type=float, default=600)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Write JSON results here as well as stdout')
+    args = parser.parse_args()
+
+    process = None
+    url = args.url
+    if url is None:
+        from synthetic import generate
+        rows = parse_size(args.rows)
+        root = Path(args.data_dir) / f'rows-{rows}'
+        if not (root / 'outputs' / 'latent_space' / 'metadata.json').exists():
+            print(f"Generating {rows:,} synthetic artworks in {root}...", file=sys.stderr)
+            generate(root, rows)
+        print(f"Starting app on {rows:,} artworks with the fake generator...", file=sys.stderr)
+        process, url = start_server(root, args)
+
+    results = []
+    try:
+        for level in [int(c) for c in args.concurrency.split(',')]:
+            result = run_level(url, level, args.duration, args.steps, args.ai_share, args.think_time, args.seed)
+            results.append(result)
+            if result['requests']:
+                print(f"  {level:>4} visitors: {result['rps']:8.1f} req/s  {result['sessions_per_s']:6.2f} sessions/s  "
+                      f"p50 {result['p50_ms']:8.1f} ms  p99 {result['p99_ms']:8.1f} ms  "
+                      f"errors {result['errors']}", file=sys.stderr)
+            else:
+                print(f"  {level:>4} visitors: no requests completed", file=sys.stderr)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    report = {'run': {**run_info(), 'url': url if args.url else None, 'args': vars(args)}, 'results': results}
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Benchmark Suite
+
+Runs the app against synthetic collections (see synthetic.py) and records:
+  - app startup time (import app.py: load the latent space and build indexes)
+  - peak RSS of the app process
+  - p50/p99 latency of find_nearest_by_dimension for every dimension
+    (and for facet-weighted similarity when the collection has facets)
+  - p50/p99 latency of /api/stats for short and long paths
+
+Each size runs in a fresh subprocess so startup and memory are measured
+cold. Results are written as JSON so runs can be compared:
+
+Usage:
+    ./venv/bin/python benchmarks/run_benchmarks.py --sizes 160k,1m --output before.json
+    ./venv/bin/python benchmarks/run_benchmarks.py --sizes 160k,1m --output after.json
+    ./venv/bin/python benchmarks/run_benchmarks.py --compare before.json after.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+DIMENSIONS = ['similar', 'nationality', 'gender', 'medium', 'department', 'era']
+STATS_PATH_LENGTHS = [20, 1000]
+FACET_WEIGHTS = {'what': 1, 'who': 0.5, 'how': 2, 'where': 0}
+
+
+def parse_size(text):
+    text = text.strip().lower()
+    scale = {'k': 1_000, 'm': 1_000_000}.get(text[-1], 1)
+    return int(float(text.rstrip('km')) * scale)
+
+
+def percentiles(seconds):
+    ms = np.array(seconds) * 1000
+    return {'p50_ms': float(np.percentile(ms, 50)), 'p99_ms': float(np.percentile(ms, 99)),
+            'mean_ms': float(ms.mean()), 'n': len(ms)}
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def worker(data_root, queries, output):
+    """Runs inside the benchmark subprocess, from the synthetic collection's directory"""
+    os.chdir(data_root)
+    sys.path.insert(0, str(REPO_ROOT))
+
+    start = time.perf_counter()
+    import app
+    startup = time.perf_counter() - start
+    rss_after_startup = peak_rss_mb()
+
+    n_artworks = len(app.snapshots.current)
+    rng = np.random.default_rng(0)
+    picks = rng.integers(0, n_artworks, size=queries)
+
+    navigation = {}
+    for dimension in DIMENSIONS:
+        app.find_nearest_by_dimension(int(picks[0]), dimension, 10)  # warm up
+        timings = []
+        for idx in picks:
+            t = time.perf_counter()
+            app.find_nearest_by_dimension(int(idx), dimension, 10)
+            timings.append(time.perf_counter() - t)
+        navigation[dimension] = percentiles(timings)
+
+    if app.snapshots.current.facets is not None:
+        timings = []
+        for idx in picks:
+            t = time.perf_counter()
+            app.find_nearest_by_dimension(int(idx), 'similar', 10, FACET_WEIGHTS)
+            timings.append(time.perf_counter() - t)
+        navigation['similar_facet_weighted'] = percentiles(timings)
+
+    client = app.app.test_client()
+    stats = {}
+    for length in STATS_PATH_LENGTHS:
+        timings = []
+        for _ in range(max(10, queries // 5)):
+            path = rng.integers(0, n_artworks, size=length).tolist()
+            t = time.perf_counter()
+            response = client.post('/api/stats', json={'path': path})
+            timings.append(time.perf_counter() - t)
+            assert response.status_code == 200, response.get_data(as_text=True)
+        stats[f'path_{length}'] = percentiles(timings)
+
+    with open(output, 'w') as f:
+        json.dump({
+            'rows': n_artworks,
+            'startup_s': startup,
+            'rss_after_startup_mb': rss_after_startup,
+            'peak_rss_mb': peak_rss_mb(),
+            'find_nearest_by_dimension': navigation,
+            'api_stats': stats,
+        }, f)
+
+
+def app_env(search_workers):
+    """
+    Settings pinned for the app under test. load_dotenv never overrides
+    variables that are already set, so a developer's .env can't change what
+    is measured.
+    """
+    return {'LAZY_STARTUP': '0', 'SEARCH_WORKERS': str(search_workers)}
+
+
+def run_size(rows, data_dir, queries, search_workers=0):
+    from synthetic import generate
+
+    root = Path(data_dir) / f'rows-{rows}'
+    if not (root / 'outputs' / 'latent_space' / 'metadata.json').exists():
+        print(f"Generating {rows:,} synthetic artworks in {root}...", file=sys.stderr)
+        generate(root, rows)
+
+    with tempfile.NamedTemporaryFile(suffix='.json') as out:
+        print(f"Benchmarking {rows:,} artworks...", file=sys.stderr)
+        subprocess.run([sys.executable, __file__, '--worker', str(root), '--queries', str(queries),
+                        '--worker-output', out.name],
+                       check=True, stdout=subprocess.DEVNULL, env={**os.environ, **app_env(search_workers)})
+        with open(out.name) as f:
+            return json.load(f)
+
+
+def run_info(search_workers=0):
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'git_commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'app_env': app_env(search_workers),
+    }
+
+
+def flatten(result):
+    """{'metric.path': value} for every numeric leaf"""
+    flat = {}
+    def walk(prefix, value):
+        if isinstance(value, dict):
+            for key, child in value.items():
+                walk(f'{prefix}.{key}' if prefix else key, child)
+        elif isinstance(value, (int, float)) and not prefix.endswith('.n'):
+            flat[prefix] = value
+    walk('', result)
+    return flat
+
+
+def compare(base_path, new_path):
+    with open(base_path) as f:
+        base = {r['rows']: flatten(r) for r in json.load(f)['results']}
+    with open(new_path) as f:
+        new = {r['rows']: flatten(r) for r in json.load(f)['results']}
+
+    for rows in sorted(set(base) & set(new)):
+        print(f"\n{rows:,} artworks")
+        print(f"  {'metric':<55} {'base':>10} {'new':>10} {'ratio':>7}")
+        for metric in base[rows]:
+            if metric == 'rows' or metric not in new[rows]:
+                continue
+            b, n = base[rows][metric], new[rows][metric]
+            ratio = n / b if b else float('nan')
+            print(f"  {metric:<55} {b:>10.2f} {n:>10.2f} {ratio:>6.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='160k,1m,10m', help='Comma-separated row counts (k/m suffixes)')
+    parser.add_argument('--queries', type=int, default=200, help='Queries per dimension')
+    parser.add_argument('--search-workers', type=int, default=0, help='SEARCH_WORKERS for the app under test')
+    parser.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), 'anadol-bench'),
+                        help='Where synthetic collections are generated and reused')
+    parser.add_argument('--output', help='Write JSON results here as well as stdout')
+    parser.add_argument('--compare', nargs=2, metavar=('BASE', 'NEW'), help='Compare two result files')
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    parser.add_argument('--worker-output', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker, args.queries, args.worker_output)
+        return
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    results = [run_size(parse_size(size), args.data_dir, args.queries, args.search_workers)
+               for size in args.sizes.split(',')]
+    report = {'run': run_info(args.search_workers), 'results': results}
+
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Sharded Search Scaling Benchmark
+
+Measures navigate-style queries against search.ShardedSearch on a synthetic
+matrix as the number of shard workers grows from 1 to N cores:
+  - latency of one query at a time (fan-out speedup)
+  - throughput with many concurrent queries (what a threaded server sees)
+
+Usage:
+    ./venv/bin/python benchmarks/search_scaling.py --rows 10000000 --max-workers 16
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from search import DIMENSION_FILTERS, ShardedSearch
+
+
+def synthetic_index(rows, dim, path, seed=0):
+    """Random embeddings written in chunks (so 10M rows fit) plus skewed codes"""
+    rng = np.random.default_rng(seed)
+    embeddings = np.lib.format.open_memmap(path, mode='w+', dtype=np.float32, shape=(rows, dim))
+    for lo in range(0, rows, 1_000_000):
+        hi = min(lo + 1_000_000, rows)
+        embeddings[lo:hi] = rng.standard_normal((hi - lo, dim), dtype=np.float32)
+    embeddings.flush()
+
+    columns = {}
+    for name, _ in DIMENSION_FILTERS.values():
+        # Zipf-like skew: code 1 dominates, like American/male in the real data
+        weights = 1.0 / np.arange(1, 51) ** 1.2
+        codes = rng.choice(50, size=rows, p=weights / weights.sum()).astype(np.int32)
+        columns[name] = {'codes': codes, 'labels': [str(i) for i in range(50)]}
+    return np.load(path, mmap_mode='r'), columns
+
+
+def run(search, n_rows, dimensions, queries, concurrency, k, seed=1):
+    rng = np.random.default_rng(seed)
+    picks = rng.integers(0, n_rows, size=queries)
+
+    latencies = []
+    for i, idx in enumerate(picks):
+        start = time.perf_counter()
+        search.nearest(int(idx), dimensions[i % len(dimensions)], k)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(lambda i: search.nearest(int(picks[i]), dimensions[i % len(dimensions)], k),
+                      range(queries)))
+    elapsed = time.perf_counter() - start
+
+    latencies = np.array(latencies) * 1000
+    return {
+        'p50_ms': float(np.percentile(latencies, 50)),
+        'p99_ms': float(np.percentile(latencies, 99)),
+        'throughput_qps': queries / elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--dim', type=int, default=50)
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count())
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--output', help='Write JSON results here as well as stdout')
+    args = parser.parse_args()
+
+    worker_counts = sorted({1, args.max_workers} | {w for w in (2, 4, 8, 16, 32, 64) if w < args.max_workers})
+    dimensions = ['similar'] + list(DIMENSION_FILTERS)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'embeddings.npy'
+        print(f"Generating {args.rows:,} x {args.dim} synthetic embeddings...", file=sys.stderr)
+        embeddings, columns = synthetic_index(args.rows, args.dim, path)
+
+        results = []
+        for workers in [0] + worker_counts:
+            search = ShardedSearch(embeddings, columns, path, workers=workers)
+            try:
+                stats = run(search, args.rows, dimensions, args.queries, max(1, workers) * 2, args.k)
+            finally:
+                search.close()
+            stats.update({'workers': workers, 'rows': args.rows, 'cpus': os.cpu_count()})
+            results.append(stats)
+            label = 'in-process' if workers == 0 else f'{workers} workers'
+            print(f"  {label:>12}: p50 {stats['p50_ms']:.1f} ms  p99 {stats['p99_ms']:.1f} ms  "
+                  f"{stats['throughput_qps']:.1f} q/s", file=sys.stderr)
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
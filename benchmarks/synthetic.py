@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Synthetic MoMA-like Collections
+
+Generates a directory the app can run from (outputs/latent_space/ plus
+data/artworks/moma_data/Artists.json) at any size, without the real MoMA
+dump or the LFS artifacts. Categorical fields follow the skew recorded in
+outputs/latent_space/statistics.json (about half the works by American
+artists, about 81% by men), and embeddings are clustered by department,
+nationality and gender so filtered navigation behaves like the real space.
+Facet embeddings (see facets.py) cluster by the fields each facet encodes.
+
+Everything is written in chunks, so 10M rows never sit in memory at once.
+
+Usage:
+    ./venv/bin/python benchmarks/synthetic.py /tmp/moma-1m --rows 1000000
+"""
+
+import argparse
+import json
+import sys
+import numpy as np
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from facets import FACET_DIM, FACET_NAMES, FACETS_FILE, normalize_blocks
+
+
+# Artwork share by artist nationality, from statistics.json (top 10 + tail)
+NATIONALITIES = {
+    'American': 0.490, 'French': 0.148, 'German': 0.064, None: 0.041,
+    'British': 0.039, 'Spanish': 0.021, 'Italian': 0.021, 'Japanese': 0.017,
+    'Russian': 0.016, 'Swiss': 0.015,
+}
+N_TAIL_NATIONALITIES = 100
+
+GENDERS = {
+    'male': 0.8093, 'female': 0.1337, None: 0.0565, 'female (transwoman)': 0.0004,
+    'non-binary': 0.0001,
+}
+
+DEPARTMENTS = {
+    'Drawings & Prints': 0.48, 'Photography': 0.20, 'Architecture & Design': 0.15,
+    'Film': 0.07, 'Painting & Sculpture': 0.03, 'Media and Performance': 0.03,
+    'Fluxus Collection': 0.02, 'Architecture & Design - Image Archive': 0.02,
+}
+
+CLASSIFICATIONS = ['Print', 'Photograph', 'Drawing', 'Illustrated Book', 'Design',
+                   'Architecture', 'Film', 'Painting', 'Sculpture', 'Video', 'Multiple']
+
+N_MEDIUMS = 500
+EMBEDDING_DIM = 50
+CHUNK = 100_000
+
+
+def _distribution(table, tail_name=None, tail_size=0):
+    """Labels and probabilities, spreading any leftover mass over a Zipf tail"""
+    labels = list(table)
+    probs = list(table.values())
+    leftover = 1.0 - sum(probs)
+    if tail_size and leftover > 0:
+        weights = 1.0 / np.arange(1, tail_size + 1) ** 1.1
+        labels += [f'{tail_name} {i}' for i in range(1, tail_size + 1)]
+        probs += list(leftover * weights / weights.sum())
+    probs = np.array(probs)
+    return labels, probs / probs.sum()
+
+
+def _zipf(n, s=1.0):
+    weights = 1.0 / np.arange(1, n + 1) ** s
+    return weights / weights.sum()
+
+
+def _column_labels(labels, probs):
+    """Label table in columns.py order: Unknown first, then most frequent"""
+    known = [(p, l) for l, p in zip(labels, probs) if l is not None]
+    return ['Unknown'] + [l for _, l in sorted(known, key=lambda x: -x[0])]
+
+
+def _write_json_items(f, items, first):
+    """Append items to a JSON array being written to f"""
+    for i, item in enumerate(items):
+        if i or not first:
+            f.write(',')
+        f.write(json.dumps(item))
+
+
+def generate(root, rows, seed=0):
+    """Write a runnable synthetic collection under root. Returns the root Path."""
+    root = Path(root)
+    latent_dir = root / 'outputs' / 'latent_space'
+    data_dir = root / 'data' / 'artworks' / 'moma_data'
+    latent_dir.mkdir(parents=True, exist_ok=True)
+    data_dir.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+
+    nat_labels, nat_probs = _distribution(NATIONALITIES, 'Nationality', N_TAIL_NATIONALITIES)
+    gender_labels, gender_probs = _distribution(GENDERS)
+    dept_labels, dept_probs = _distribution(DEPARTMENTS)
+    mediums = [f'Medium {i}' for i in range(N_MEDIUMS)]
+    medium_probs = _zipf(N_MEDIUMS)
+    class_probs = _zipf(len(CLASSIFICATIONS), 0.8)
+
+    # Artists carry nationality and gender; works pick artists uniformly so
+    # the artwork-level skew matches statistics.json
+    n_artists = max(100, rows // 10)
+    artist_nat = rng.choice(len(nat_labels), size=n_artists, p=nat_probs)
+    artist_gender = rng.choice(len(gender_labels), size=n_artists, p=gender_probs)
+    artist_born = rng.integers(1840, 1990, size=n_artists)
+    artists = [{
+        'ConstituentID': i + 1,
+        'DisplayName': f'Artist {i + 1}',
+        'Nationality': nat_labels[artist_nat[i]],
+        'Gender': gender_labels[artist_gender[i]],
+        'BeginDate': int(artist_born[i]),
+        'EndDate': int(artist_born[i] + rng.integers(30, 90)),
+    } for i in range(n_artists)]
+    with open(data_dir / 'Artists.json', 'w') as f:
+        json.dump(artists, f)
+
+    # Cluster centres so similar metadata means nearby embeddings
+    dept_centres = rng.normal(0, 1.0, size=(len(dept_labels), EMBEDDING_DIM))
+    nat_centres = rng.normal(0, 0.6, size=(len(nat_labels), EMBEDDING_DIM))
+    gender_centres = rng.normal(0, 0.3, size=(len(gender_labels), EMBEDDING_DIM))
+
+    # Facet centres: what ~ classification, who ~ nationality + gender,
+    # how ~ medium, where ~ department
+    facet_centres = {
+        'what': rng.normal(0, 1.0, size=(len(CLASSIFICATIONS), FACET_DIM)),
+        'who': rng.normal(0, 1.0, size=(len(nat_labels), FACET_DIM)),
+        'who_gender': rng.normal(0, 0.5, size=(len(gender_labels), FACET_DIM)),
+        'how': rng.normal(0, 1.0, size=(N_MEDIUMS, FACET_DIM)),
+        'where': rng.normal(0, 1.0, size=(len(dept_labels), FACET_DIM)),
+    }
+
+    embeddings = np.lib.format.open_memmap(latent_dir / 'embeddings_reduced.npy', mode='w+',
+                                           dtype=np.float32, shape=(rows, EMBEDDING_DIM))
+    facets = np.lib.format.open_memmap(latent_dir / FACETS_FILE, mode='w+', dtype=np.float32,
+                                       shape=(rows, len(FACET_NAMES) * FACET_DIM))
+    nat_label_table = _column_labels(nat_labels, nat_probs)
+    gender_label_table = _column_labels(gender_labels, gender_probs)
+    dept_label_table = _column_labels(dept_labels, dept_probs)
+    class_label_table = ['Unknown'] + CLASSIFICATIONS
+    medium_label_table = ['Unknown'] + mediums
+    decade_label_table = ['Unknown'] + [str(d) for d in range(2020, 1910, -10)]
+    codes = {name: np.zeros(rows, dtype=np.int32)
+             for name in ['nationality', 'gender', 'department', 'classification', 'medium', 'decade']}
+
+    def lookup(table):
+        return {label: code for code, label in enumerate(table)}
+    nat_code, gender_code, dept_code = lookup(nat_label_table), lookup(gender_label_table), lookup(dept_label_table)
+
+    with open(latent_dir / 'artworks.json', 'w') as artworks_file, \
+            open(latent_dir / 'descriptions.json', 'w') as descriptions_file:
+        artworks_file.write('[')
+        descriptions_file.write('[')
+
+        for lo in range(0, rows, CHUNK):
+            hi = min(lo + CHUNK, rows)
+            n = hi - lo
+            artist = rng.integers(0, n_artists, size=n)
+            dept = rng.choice(len(dept_labels), size=n, p=dept_probs)
+            medium = rng.choice(N_MEDIUMS, size=n, p=medium_probs)
+            cls = rng.choice(len(CLASSIFICATIONS), size=n, p=class_probs)
+            size = rng.integers(5, 200, size=(n, 2))
+            created = artist_born[artist] + rng.integers(18, 60, size=n)
+            acquired = np.minimum(2020, np.maximum(1929, created + rng.integers(0, 60, size=n)))
+            has_acq = rng.random(n) > 0.03
+
+            embeddings[lo:hi] = (dept_centres[dept] + nat_centres[artist_nat[artist]]
+                                 + gender_centres[artist_gender[artist]]
+                                 + rng.normal(0, 0.8, size=(n, EMBEDDING_DIM)))
+            facets[lo:hi] = normalize_blocks(np.hstack([
+                facet_centres['what'][cls],
+                facet_centres['who'][artist_nat[artist]] + facet_centres['who_gender'][artist_gender[artist]],
+                facet_centres['how'][medium],
+                facet_centres['where'][dept],
+            ]) + rng.normal(0, 0.6, size=(n, len(FACET_NAMES) * FACET_DIM)))
+
+            codes['nationality'][lo:hi] = [nat_code.get(nat_labels[c], 0) for c in artist_nat[artist]]
+            codes['gender'][lo:hi] = [gender_code.get(gender_labels[c], 0) for c in artist_gender[artist]]
+            codes['department'][lo:hi] = [dept_code[dept_labels[d]] for d in dept]
+            codes['classification'][lo:hi] = cls + 1
+            codes['medium'][lo:hi] = medium + 1
+            codes['decade'][lo:hi] = np.where(has_acq, (2020 - (acquired // 10) * 10) // 10 + 1, 0)
+
+            chunk = [{
+                'Title': f'Untitled {lo + i}',
+                'Artist': artists[artist[i]]['DisplayName'],
+                'ConstituentID': [int(artist[i]) + 1],
+                'Date': str(created[i]),
+                'Medium': mediums[medium[i]],
+                'Dimensions': f'{size[i, 0]} x {size[i, 1]} cm',
+                'Classification': CLASSIFICATIONS[cls[i]],
+                'Department': dept_labels[dept[i]],
+                'DateAcquired': f'{acquired[i]}-01-01' if has_acq[i] else None,
+                'CreditLine': 'Gift of a synthetic donor',
+            } for i in range(n)]
+            _write_json_items(artworks_file, chunk, first=lo == 0)
+            _write_json_items(descriptions_file, [
+                f"Title: {a['Title']}. Artist: {a['Artist']}. Medium: {a['Medium']}. Department: {a['Department']}"
+                for a in chunk
+            ], first=lo == 0)
+
+        artworks_file.write(']')
+        descriptions_file.write(']')
+    embeddings.flush()
+    facets.flush()
+
+    np.savez(latent_dir / 'columns.npz', **codes)
+    with open(latent_dir / 'columns.json', 'w') as f:
+        json.dump({
+            'nationality': nat_label_table, 'gender': gender_label_table,
+            'department': dept_label_table, 'classification': class_label_table,
+            'medium': medium_label_table, 'decade': decade_label_table,
+        }, f)
+
+    with open(latent_dir / 'metadata.json', 'w') as f:
+        json.dump({
+            'version': f'synthetic-{rows}',
+            'n_artworks': rows,
+            'embedding_dim_reduced': EMBEDDING_DIM,
+            'model_name': 'synthetic',
+            'facets': {'names': FACET_NAMES, 'dim': FACET_DIM},
+            'seed': seed,
+        }, f, indent=2)
+    return root
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate a synthetic MoMA-like collection')
+    parser.add_argument('root', help='Directory to create (run the app from here)')
+    parser.add_argument('--rows', type=int, default=160_000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"Generating {args.rows:,} synthetic artworks in {args.root}...", file=sys.stderr)
+    generate(args.root, args.rows, args.seed)
+    print("✓ Done", file=sys.stderr)
@@ -17,6 +17,11 @@ from sentence_transformers import SentenceTransformer
 from sklearn.decomposition import PCA
 from sklearn.preprocessing import normalize
 
+from columns import build_columns, save_columns
+from facets import FACET_NAMES, build_facet_matrix, save_facets
+from snapshot import SNAPSHOT_ROOT, new_version, publish
+from tiles import write_tiles
+
 print("=" * 70)
 print("BUILDING LATENT SPACE FROM MOMA COLLECTION")
 print("=" * 70)
@@ -155,16 +160,25 @@ pca = PCA(n_components=50)  # Reduce to 50D for faster nearest neighbor search
 embeddings_reduced = pca.fit_transform(embeddings_normalized)
 print(f"   ✓ Reduced to {embeddings_reduced.shape[1]} dimensions")
 print(f"   ✓ Explained variance: {pca.explained_variance_ratio_.sum():.2%}")
+
+# Facets are encoded separately so the app can re-weight "similar" per query
+print(f"   Encoding facet embeddings ({'/'.join(FACET_NAMES)})...")
+facet_matrix, facet_variance = build_facet_matrix(model, valid_artworks, artists)
+print(f"   ✓ Facet matrix: shape {facet_matrix.shape}")
 print()
 
 # Save everything
+# Each build is a new snapshot directory; the running app switches to it
+# only once it is complete and published (step 10)
 print("7. Saving latent space...")
-output_dir = Path('outputs/latent_space')
+version = new_version()
+output_dir = SNAPSHOT_ROOT / version
 output_dir.mkdir(parents=True, exist_ok=True)
 
 # Save embeddings
 np.save(output_dir / 'embeddings_full.npy', embeddings_normalized)
 np.save(output_dir / 'embeddings_reduced.npy', embeddings_reduced)
+facet_info = save_facets(output_dir, facet_matrix)
 
 # Save artworks and descriptions
 with open(output_dir / 'artworks.json', 'w') as f:
@@ -179,11 +193,13 @@ with open(output_dir / 'pca_model.pkl', 'wb') as f:
 
 # Save metadata
 metadata = {
+    'version': version,
     'n_artworks': len(valid_artworks),
     'embedding_dim_full': embeddings_normalized.shape[1],
     'embedding_dim_reduced': embeddings_reduced.shape[1],
     'model_name': 'all-MiniLM-L6-v2',
-    'pca_variance_explained': float(pca.explained_variance_ratio_.sum())
+    'pca_variance_explained': float(pca.explained_variance_ratio_.sum()),
+    'facets': {**facet_info, 'pca_variance_explained': facet_variance}
 }
 
 with open(output_dir / 'metadata.json', 'w') as f:
@@ -243,6 +259,19 @@ stats = {
 with open(output_dir / 'statistics.json', 'w') as f:
     json.dump(stats, f, indent=2)
 
+# Coded metadata columns and the 2D map of the whole collection
+print("9. Building collection map tiles...")
+columns = build_columns(valid_artworks, artists)
+save_columns(output_dir, columns)
+tile_manifest = write_tiles(output_dir, embeddings_reduced, columns)
+print(f"   ✓ Wrote {tile_manifest['n_tiles']:,} tiles, zoom 0-{tile_manifest['max_zoom']}")
+print()
+
+print("10. Publishing snapshot...")
+publish(version)
+print(f"   ✓ {SNAPSHOT_ROOT}/CURRENT -> {version}")
+print()
+
 print("=" * 70)
 print("✓ LATENT SPACE BUILT SUCCESSFULLY!")
 print("=" * 70)
@@ -250,6 +279,12 @@ print()
 print(f"Artworks in latent space: {len(valid_artworks):,}")
 print(f"Embedding dimensions: {embeddings_reduced.shape[1]}")
 print()
+print("Optional: analyze representation density across the whole collection")
+print("  ./venv/bin/python density.py")
+print()
 print("Next step: Launch the interactive website")
 print("  ./venv/bin/python app.py")
 print()
+print("Already running? Switch it over without a restart:")
+print("  curl -X POST http://localhost:5001/api/snapshot/reload")
+print()
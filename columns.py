@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Coded Metadata Columns
+
+Turns the categorical fields of every artwork (nationality, gender,
+department, ...) into compact integer arrays plus a label table per column.
+Code 0 is always 'Unknown'; the remaining codes are ordered by frequency.
+"""
+
+import json
+import numpy as np
+from pathlib import Path
+
+
+COLUMN_NAMES = ['nationality', 'gender', 'department', 'classification', 'medium', 'decade']
+
+UNKNOWN = 'Unknown'
+
+ARTISTS_PATH = Path('data/artworks/moma_data/Artists.json')
+
+
+def primary_artist(artwork, artists):
+    """Return the artist record for an artwork's first constituent, if any"""
+    const_ids = artwork.get('ConstituentID')
+    if isinstance(const_ids, list) and const_ids:
+        return artists.get(const_ids[0])
+    return None
+
+
+def acquisition_decade(artwork):
+    """Decade label ('1960') from DateAcquired, or None"""
+    date_acq = artwork.get('DateAcquired') or ''
+    if len(date_acq) >= 4:
+        try:
+            return str((int(date_acq[:4]) // 10) * 10)
+        except ValueError:
+            return None
+    return None
+
+
+def artwork_values(artwork, artists):
+    """Raw categorical values for one artwork, keyed by column name"""
+    artist = primary_artist(artwork, artists) or {}
+    return {
+        'nationality': artist.get('Nationality'),
+        'gender': artist.get('Gender'),
+        'department': artwork.get('Department'),
+        'classification': artwork.get('Classification'),
+        'medium': artwork.get('Medium'),
+        'decade': acquisition_decade(artwork),
+    }
+
+
+def build_columns(artworks, artists):
+    """
+    Encode every artwork's categorical fields.
+
+    Returns {name: {'codes': int32 array, 'labels': [str, ...]}} where
+    labels[code] is the original value and labels[0] is 'Unknown'.
+    """
+    raw = {name: [] for name in COLUMN_NAMES}
+    for artwork in artworks:
+        values = artwork_values(artwork, artists)
+        for name in COLUMN_NAMES:
+            raw[name].append(values[name] or UNKNOWN)
+
+    columns = {}
+    for name in COLUMN_NAMES:
+        uniques, inverse, counts = np.unique(np.array(raw[name], dtype=object).astype(str),
+                                             return_inverse=True, return_counts=True)
+        # Unknown first, then most frequent first
+        order = sorted(range(len(uniques)),
+                       key=lambda i: (uniques[i] != UNKNOWN, -counts[i], uniques[i]))
+        labels = [str(uniques[i]) for i in order]
+        if labels[0] != UNKNOWN:
+            labels.insert(0, UNKNOWN)
+        remap = np.empty(len(uniques), dtype=np.int32)
+        for code, i in enumerate(order, start=len(labels) - len(order)):
+            remap[i] = code
+        columns[name] = {
+            'codes': remap[inverse.reshape(-1)],
+            'labels': labels,
+        }
+    return columns
+
+
+def save_columns(output_dir, columns):
+    """Write codes to columns.npz and label tables to columns.json"""
+    output_dir = Path(output_dir)
+    np.savez(output_dir / 'columns.npz',
+             **{name: col['codes'] for name, col in columns.items()})
+    with open(output_dir / 'columns.json', 'w') as f:
+        json.dump({name: col['labels'] for name, col in columns.items()}, f)
+
+
+def load_columns(output_dir):
+    """Load columns written by save_columns, or None if they were never built"""
+    output_dir = Path(output_dir)
+    if not (output_dir / 'columns.npz').exists() or not (output_dir / 'columns.json').exists():
+        return None
+    with open(output_dir / 'columns.json', 'r') as f:
+        labels = json.load(f)
+    with np.load(output_dir / 'columns.npz') as codes:
+        return {name: {'codes': codes[name], 'labels': labels[name]} for name in labels}
+
+
+def load_or_build_columns(snapshot_dir, artists_path=ARTISTS_PATH):
+    """A snapshot's columns, encoding and saving them first if the build predates them"""
+    snapshot_dir = Path(snapshot_dir)
+    columns = load_columns(snapshot_dir)
+    if columns is None:
+        print("   Encoding metadata columns...")
+        with open(snapshot_dir / 'artworks.json', 'r') as f:
+            artworks = json.load(f)
+        with open(artists_path, 'r') as f:
+            artists = {a['ConstituentID']: a for a in json.load(f)}
+        columns = build_columns(artworks, artists)
+        save_columns(snapshot_dir, columns)
+    return columns
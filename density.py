@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Representation Density Analysis
+
+For every artwork, finds its k nearest neighbours (cosine similarity over
+the reduced embeddings, exact) and measures who lives in each neighbourhood:
+how often an artwork's neighbours share its artist's gender or nationality,
+and how much of the space each group occupies compared with its share of
+the collection.
+
+The N x N similarity matrix is never materialized. Rows are processed in
+blocks on a thread pool; each block is scored against the collection one
+column block at a time, keeping a running top-k. NumPy releases the GIL
+inside the matrix products, so the blocks run in parallel.
+
+Writes to the snapshot directory:
+    density.json - per-group scores for gender and nationality
+    density.npz  - knn (N x k neighbour indices) and per-artwork
+                   same-group fractions, for per-artwork lookups
+
+Usage:
+    ./venv/bin/python density.py [--k 20] [--threads 8]
+"""
+
+import json
+import os
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from search import unit_rows
+
+
+DENSITY_COLUMNS = ['gender', 'nationality']
+
+# Per thread: a ROW_BLOCK x COL_BLOCK float32 score tile (16 MB) plus its
+# partition indices, so memory stays flat however large the collection is
+ROW_BLOCK = 512
+COL_BLOCK = 8192
+
+
+def knn_block(unit, lo, hi, k, col_block=COL_BLOCK):
+    """Exact k nearest neighbours (excluding self) for rows lo:hi"""
+    queries = unit[lo:hi]
+    n_rows = hi - lo
+    best_ids = np.full((n_rows, k), -1, dtype=np.int64)
+    best_sims = np.full((n_rows, k), -np.inf, dtype=np.float32)
+    row_ids = np.arange(lo, hi)
+
+    for c_lo in range(0, len(unit), col_block):
+        c_hi = min(c_lo + col_block, len(unit))
+        sims = queries @ unit[c_lo:c_hi].T
+
+        # Never count an artwork as its own neighbour
+        own = (row_ids >= c_lo) & (row_ids < c_hi)
+        sims[np.flatnonzero(own), row_ids[own] - c_lo] = -np.inf
+
+        # Block top-k first, then merge with the running top-k (2k wide)
+        kk = min(k, c_hi - c_lo)
+        block_top = np.argpartition(-sims, kk - 1, axis=1)[:, :kk]
+        cand_sims = np.concatenate([best_sims, np.take_along_axis(sims, block_top, axis=1)], axis=1)
+        cand_ids = np.concatenate([best_ids, block_top + c_lo], axis=1)
+        top = np.argpartition(-cand_sims, k - 1, axis=1)[:, :k]
+        best_sims = np.take_along_axis(cand_sims, top, axis=1)
+        best_ids = np.take_along_axis(cand_ids, top, axis=1)
+
+    # Best first within each row
+    order = np.argsort(-best_sims, axis=1, kind='stable')
+    return np.take_along_axis(best_ids, order, axis=1).astype(np.int32)
+
+
+def compute_knn(embeddings, k=20, threads=None, row_block=ROW_BLOCK, progress=None):
+    """N x k neighbour indices for the whole collection"""
+    unit = unit_rows(embeddings)
+    k = min(k, len(unit) - 1)
+    knn = np.empty((len(unit), k), dtype=np.int32)
+    blocks = [(lo, min(lo + row_block, len(unit))) for lo in range(0, len(unit), row_block)]
+
+    def run(bounds):
+        lo, hi = bounds
+        knn[lo:hi] = knn_block(unit, lo, hi, k)
+        return hi - lo
+
+    with ThreadPoolExecutor(max_workers=threads or os.cpu_count()) as pool:
+        for done in pool.map(run, blocks):
+            if progress:
+                progress(done)
+    return knn
+
+
+def group_scores(codes, labels, knn):
+    """
+    Per-group neighbourhood composition.
+
+    share                - fraction of the collection in the group
+    neighbourhood_share  - fraction of all neighbour slots the group fills
+    representation_ratio - neighbourhood_share / share (>1: over-represented
+                           in the space relative to the archive)
+    same_group_rate      - for group members, mean fraction of neighbours
+                           from the same group
+    isolation            - same_group_rate rescaled against chance:
+                           (same_group_rate - share) / (1 - share)
+    """
+    n, k = knn.shape
+    n_groups = len(labels)
+    neighbour_codes = codes[knn]
+    same = (neighbour_codes == codes[:, None]).mean(axis=1)
+
+    counts = np.bincount(codes, minlength=n_groups)
+    slots = np.bincount(neighbour_codes.ravel(), minlength=n_groups)
+    same_sum = np.bincount(codes, weights=same, minlength=n_groups)
+
+    groups = []
+    for code in np.argsort(-counts, kind='stable'):
+        if counts[code] == 0:
+            continue
+        share = counts[code] / n
+        neighbourhood_share = slots[code] / (n * k)
+        same_group_rate = same_sum[code] / counts[code]
+        groups.append({
+            'label': labels[code],
+            'count': int(counts[code]),
+            'share': float(share),
+            'neighbourhood_share': float(neighbourhood_share),
+            'representation_ratio': float(neighbourhood_share / share),
+            'same_group_rate': float(same_group_rate),
+            'isolation': float((same_group_rate - share) / (1 - share)) if share < 1 else 0.0,
+        })
+    return groups, same.astype(np.float16)
+
+
+def write_density(output_dir, embeddings, columns, k=20, threads=None, progress=None):
+    """Run the analysis and write density.json / density.npz. Returns the summary."""
+    output_dir = Path(output_dir)
+    knn = compute_knn(embeddings, k, threads, progress=progress)
+
+    summary = {'k': int(knn.shape[1]), 'n_artworks': int(len(knn)), 'columns': {}}
+    per_artwork = {'knn': knn}
+    for name in DENSITY_COLUMNS:
+        groups, same = group_scores(columns[name]['codes'], columns[name]['labels'], knn)
+        summary['columns'][name] = groups
+        per_artwork[f'same_{name}'] = same
+
+    np.savez(output_dir / 'density.npz', **per_artwork)
+    with open(output_dir / 'density.json', 'w') as f:
+        json.dump(summary, f)
+    return summary
+
+
+def load_density(output_dir):
+    """(summary, per-artwork arrays) written by write_density, or None if never run"""
+    output_dir = Path(output_dir)
+    if not (output_dir / 'density.json').exists() or not (output_dir / 'density.npz').exists():
+        return None
+    with open(output_dir / 'density.json', 'r') as f:
+        summary = json.load(f)
+    with np.load(output_dir / 'density.npz') as arrays:
+        return summary, {name: arrays[name] for name in arrays.files}
+
+
+if __name__ == '__main__':
+    import argparse
+    from tqdm import tqdm
+    from columns import load_or_build_columns
+    from snapshot import current_snapshot_dir
+
+    parser = argparse.ArgumentParser(description='Collection-wide representation density analysis')
+    parser.add_argument('--k', type=int, default=20, help='Neighbours per artwork')
+    parser.add_argument('--threads', type=int, default=None, help='Worker threads (default: all cores)')
+    args = parser.parse_args()
+
+    LATENT_DIR = current_snapshot_dir()
+
+    print("Analyzing representation density...")
+    embeddings = np.load(LATENT_DIR / 'embeddings_reduced.npy', mmap_mode='r')
+
+    columns = load_or_build_columns(LATENT_DIR)
+
+    with tqdm(total=len(embeddings), desc="   Neighbourhoods") as bar:
+        summary = write_density(LATENT_DIR, embeddings, columns, args.k, args.threads, progress=bar.update)
+
+    for name in DENSITY_COLUMNS:
+        print(f"   Most isolated {name} groups (k={args.k}):")
+        groups = [g for g in summary['columns'][name] if g['count'] >= 100]
+        for group in sorted(groups, key=lambda g: g['isolation'], reverse=True)[:5]:
+            print(f"     {group['label']}: isolation {group['isolation']:.2f}, "
+                  f"representation {group['representation_ratio']:.2f}x")
+    print(f"   ✓ Saved to {LATENT_DIR}/density.json")
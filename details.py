@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Artwork Detail Payloads
+
+A snapshot never changes, so the details for one artwork never change
+either. Each payload is built and JSON-encoded once, kept in a per-snapshot
+LRU with its strong ETag, and reused by /api/artwork/<idx>, /api/random and
+every neighbour list in /api/navigate (which splices the cached bytes in
+rather than re-encoding them).
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from metrics import count
+
+
+# Payloads kept per snapshot (roughly 1KB each)
+DETAIL_CACHE_SIZE = int(os.getenv('DETAIL_CACHE_SIZE', '20000'))
+
+
+def build_details(snapshot, idx):
+    """Full details for one artwork, from its record and its primary artist"""
+    artwork = snapshot.artworks[idx]
+    details = {
+        'index': idx,
+        'title': artwork.get('Title', 'Untitled'),
+        'artist': artwork.get('Artist', 'Unknown'),
+        'date': artwork.get('Date', 'Unknown'),
+        'medium': artwork.get('Medium', 'Unknown'),
+        'dimensions': artwork.get('Dimensions', 'Unknown'),
+        'classification': artwork.get('Classification', 'Unknown'),
+        'department': artwork.get('Department', 'Unknown'),
+        'date_acquired': artwork.get('DateAcquired', 'Unknown'),
+        'credit_line': artwork.get('CreditLine', 'Unknown'),
+        'description': snapshot.descriptions[idx]
+    }
+
+    # Add artist details
+    if artwork.get('ConstituentID'):
+        const_ids = artwork['ConstituentID']
+        if isinstance(const_ids, list) and const_ids:
+            artist_id = const_ids[0]
+            if artist_id in snapshot.artists:
+                artist = snapshot.artists[artist_id]
+                details['nationality'] = artist.get('Nationality', 'Unknown')
+                details['gender'] = artist.get('Gender', 'Unknown')
+                details['birth_year'] = artist.get('BeginDate', 'Unknown')
+                details['death_year'] = artist.get('EndDate', 'Unknown')
+
+    return details
+
+
+class DetailPayload:
+    """One artwork's details as a dict, as encoded JSON bytes, and the bytes' ETag"""
+
+    __slots__ = ('details', 'body', 'etag')
+
+    def __init__(self, details):
+        self.details = details
+        self.body = json.dumps(details, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+        self.etag = hashlib.blake2b(self.body, digest_size=12).hexdigest()
+
+    def with_field(self, name, value):
+        """The encoded payload with one extra top-level field spliced in"""
+        return self.body[:-1] + b',"' + name.encode() + b'":' + json.dumps(value).encode() + b'}'
+
+
+class DetailCache:
+    """Thread-safe LRU of DetailPayloads for one snapshot"""
+
+    def __init__(self, snapshot, maxsize=DETAIL_CACHE_SIZE):
+        self.snapshot = snapshot
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, idx):
+        with self._lock:
+            payload = self._entries.get(idx)
+            if payload is not None:
+                self._entries.move_to_end(idx)
+        if payload is not None:
+            count('cache_lookups_total', cache='details', result='hit')
+            return payload
+        count('cache_lookups_total', cache='details', result='miss')
+
+        # Built outside the lock; two threads racing on one index build equal payloads
+        payload = DetailPayload(build_details(self.snapshot, idx))
+        with self._lock:
+            self._entries[idx] = payload
+            self._entries.move_to_end(idx)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return payload
+
+    def __len__(self):
+        return len(self._entries)
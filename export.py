@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Binary Bulk Export
+
+Streams row slices of stored arrays (embeddings, coded metadata columns) as
+.npy files: a standard header followed by raw little-endian rows, written in
+chunks so large exports never sit in memory twice.
+
+Contiguous ranges of a memory-mapped array are read straight from the stored
+file with no conversion when the requested dtype matches the stored one; the
+only copy is the one WSGI needs to hand each chunk to the server as bytes.
+"""
+
+import io
+import numpy as np
+
+
+EXPORT_DTYPES = {
+    'float32': np.dtype('<f4'),
+    'float16': np.dtype('<f2'),
+}
+
+CHUNK_ROWS = 8192
+
+
+def npy_header(dtype, shape):
+    """Bytes of a version 1.0 .npy header for a C-ordered array"""
+    buffer = io.BytesIO()
+    np.lib.format.write_array_header_1_0(buffer, {
+        'descr': np.lib.format.dtype_to_descr(np.dtype(dtype)),
+        'fortran_order': False,
+        'shape': tuple(int(s) for s in shape),
+    })
+    return buffer.getvalue()
+
+
+def parse_rows(n_rows, start=None, stop=None, ids=None):
+    """
+    Resolve an export selection to a slice or an index array.
+
+    Either ids (an iterable of row indices) or a start/stop range; raises
+    ValueError for anything out of bounds.
+    """
+    if ids is not None:
+        ids = list(ids)
+        # Only real integers: bools, floats and strings would be coerced silently
+        if not all(isinstance(i, (int, np.integer)) and not isinstance(i, bool) for i in ids):
+            raise ValueError('ids must be a flat list of integers')
+        rows = np.asarray(ids, dtype=np.int64)
+        if len(rows) and (rows.min() < 0 or rows.max() >= n_rows):
+            raise ValueError(f'ids must be between 0 and {n_rows - 1}')
+        return rows
+
+    start = 0 if start is None else int(start)
+    stop = n_rows if stop is None else int(stop)
+    if start < 0 or stop > n_rows or start > stop:
+        raise ValueError(f'range must satisfy 0 <= start <= stop <= {n_rows}')
+    return slice(start, stop)
+
+
+def selection_length(rows):
+    if isinstance(rows, slice):
+        return rows.stop - rows.start
+    return len(rows)
+
+
+def iter_npy(array, rows, dtype=None, chunk_rows=CHUNK_ROWS):
+    """
+    Yield an .npy file for array[rows] piece by piece.
+
+    dtype defaults to the stored dtype (forced little-endian).
+    """
+    out_dtype = np.dtype(dtype or array.dtype).newbyteorder('<')
+    n = selection_length(rows)
+    yield npy_header(out_dtype, (n,) + array.shape[1:])
+
+    for offset in range(0, n, chunk_rows):
+        if isinstance(rows, slice):
+            lo = rows.start + offset
+            chunk = array[lo:min(lo + chunk_rows, rows.stop)]
+        else:
+            chunk = array[rows[offset:offset + chunk_rows]]
+
+        if chunk.dtype != out_dtype:
+            chunk = chunk.astype(out_dtype)
+        yield np.ascontiguousarray(chunk).tobytes()
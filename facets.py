@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Facet Embeddings
+
+The single description behind embeddings_reduced.npy mixes everything about
+an artwork, so "similar" always means one fixed blend. The build also encodes
+four facet texts separately, reduces each to FACET_DIM and stores them side
+by side in embeddings_facets.npy, one row per artwork:
+
+    [ what (16) | who (16) | how (16) | where (16) ]
+
+Each block is unit length, so a query row with each block scaled by its
+facet weight gives, in a single matrix product, the weighted sum of per-facet
+cosine similarities. Changing weights needs no re-encoding.
+"""
+
+import json
+import numpy as np
+from pathlib import Path
+
+from columns import primary_artist
+
+
+FACET_NAMES = ['what', 'who', 'how', 'where']
+FACET_DIM = 16
+FACETS_FILE = 'embeddings_facets.npy'
+
+
+def facet_descriptions(artwork, artists):
+    """Text for each facet of one artwork, in the labels create_description uses"""
+    artist = primary_artist(artwork, artists) or {}
+
+    def join(pairs):
+        return ". ".join(f"{label}: {value}" for label, value in pairs if value)
+
+    return {
+        'what': join([('Title', artwork.get('Title')),
+                      ('Date created', artwork.get('Date')),
+                      ('Classification', artwork.get('Classification'))]),
+        'who': join([('Artist', artwork.get('Artist', 'Unknown')),
+                     ('Nationality', artist.get('Nationality')),
+                     ('Gender', artist.get('Gender')),
+                     ('Artist born', artist.get('BeginDate'))]),
+        'how': join([('Medium', artwork.get('Medium')),
+                     ('Dimensions', artwork.get('Dimensions'))]),
+        # Where the work sits in the museum and how it got there
+        'where': join([('Department', artwork.get('Department')),
+                       ('Acquired by MoMA', artwork.get('DateAcquired')),
+                       ('Credit', artwork.get('CreditLine'))]),
+    }
+
+
+def normalize_blocks(matrix, dim=FACET_DIM):
+    """Scale every facet block of every row to unit length (all-zero blocks stay zero)"""
+    blocks = matrix.reshape(len(matrix), -1, dim)
+    norms = np.linalg.norm(blocks, axis=2, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (blocks / norms).reshape(len(matrix), -1).astype(np.float32)
+
+
+def build_facet_matrix(model, artworks, artists, dim=FACET_DIM, batch_size=32):
+    """
+    Encode and reduce every facet (build time only; needs the sentence model).
+
+    Returns (matrix of shape (n, len(FACET_NAMES) * dim), {facet: explained variance}).
+    """
+    from sklearn.decomposition import PCA
+    from sklearn.preprocessing import normalize
+
+    texts = [facet_descriptions(a, artists) for a in artworks]
+    matrix = np.empty((len(artworks), len(FACET_NAMES) * dim), dtype=np.float32)
+    explained = {}
+    for i, name in enumerate(FACET_NAMES):
+        print(f"   Encoding '{name}' facet...")
+        encoded = model.encode([t[name] for t in texts], show_progress_bar=True,
+                               batch_size=batch_size, convert_to_numpy=True)
+        pca = PCA(n_components=dim)
+        matrix[:, i * dim:(i + 1) * dim] = pca.fit_transform(normalize(encoded, norm='l2'))
+        explained[name] = float(pca.explained_variance_ratio_.sum())
+    return normalize_blocks(matrix, dim), explained
+
+
+def save_facets(output_dir, matrix, dim=FACET_DIM):
+    np.save(Path(output_dir) / FACETS_FILE, np.ascontiguousarray(matrix, dtype=np.float32))
+    return {'names': FACET_NAMES, 'dim': dim}
+
+
+def load_facets(snapshot_dir, metadata):
+    """(memory-mapped facet matrix, facet info) or (None, None) for builds without facets"""
+    path = Path(snapshot_dir) / FACETS_FILE
+    info = metadata.get('facets')
+    if not path.exists() or not info:
+        return None, None
+    return np.load(path, mmap_mode='r'), info
+
+
+def facet_weight_vector(weights, info):
+    """
+    Per-column multipliers for a query row from {facet: weight}.
+
+    Unlisted facets get 0; weights are scaled to sum to 1 so combined
+    similarities stay in [-1, 1].
+    """
+    names = info['names']
+    unknown = [name for name in weights if name not in names]
+    if unknown:
+        raise ValueError(f"Unknown facet {', '.join(map(repr, unknown))}; use {', '.join(names)}")
+    try:
+        values = np.array([float(weights.get(name, 0)) for name in names])
+    except (TypeError, ValueError):
+        raise ValueError('Facet weights must be numbers')
+    if not np.isfinite(values).all() or (values < 0).any() or not (values > 0).any():
+        raise ValueError('Facet weights must be finite, non-negative and at least one above 0')
+    values = values / values.max()  # so huge weights can't overflow the sum
+    return np.repeat(values / values.sum(), info['dim']).astype(np.float32)
+
+
+if __name__ == '__main__':
+    # Print an artwork's facet texts, to check what each facet encodes
+    import sys
+    from snapshot import ARTISTS_PATH, current_snapshot_dir
+
+    snapshot_dir = current_snapshot_dir()
+    with open(snapshot_dir / 'artworks.json', 'r') as f:
+        artworks = json.load(f)
+    with open(ARTISTS_PATH, 'r') as f:
+        artists = {a['ConstituentID']: a for a in json.load(f)}
+    idx = int(sys.argv[1]) if len(sys.argv) > 1 else 0
+    for name, text in facet_descriptions(artworks[idx], artists).items():
+        print(f"{name:>6}: {text}")
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Image Generator Backends
+
+generate_artwork_image talks to a backend rather than to replicate directly,
+so the remote model can be swapped for a local stand-in when load testing
+or capacity planning. A backend needs:
+
+    available  - whether it can be called at all (e.g. has an API token)
+    run(model, model_input) - what replicate.run returns: a URL string, a
+                              FileOutput-like object with .url, or a list
+
+Select one with GENERATOR_BACKEND=replicate (default) or fake. The fake is
+configured with FAKE_LATENCY_MS, FAKE_JITTER_MS, FAKE_ERROR_RATE,
+FAKE_CREDIT_ERROR_RATE and FAKE_PAYLOAD (url, file_output or list).
+"""
+
+import os
+import random
+import time
+
+
+class ReplicateBackend:
+    """The real thing: replicate.run against Replicate's hosted models"""
+
+    name = 'replicate'
+
+    def __init__(self, api_token=None):
+        self.api_token = api_token
+
+    @property
+    def available(self):
+        return bool(self.api_token)
+
+    def run(self, model, model_input):
+        import replicate
+        return replicate.run(model, input=model_input)
+
+
+class FakeFileOutput:
+    """Stands in for replicate's FileOutput, which exposes the image as .url"""
+
+    def __init__(self, url):
+        self.url = url
+
+    def __repr__(self):
+        return f'FakeFileOutput({self.url!r})'
+
+
+class FakeBackend:
+    """
+    Local stand-in for Replicate with configurable latency, failures and payloads.
+
+    credit_error_rate raises the same 402 "Insufficient credit" message
+    Replicate sends when an account runs dry, which the app answers with
+    latent space data; error_rate raises a generic failure.
+    """
+
+    name = 'fake'
+    available = True
+
+    def __init__(self, latency_ms=1500, jitter_ms=500, error_rate=0.0,
+                 credit_error_rate=0.0, payload='list', seed=None):
+        if payload not in ('url', 'file_output', 'list'):
+            raise ValueError("payload must be 'url', 'file_output' or 'list'")
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.credit_error_rate = credit_error_rate
+        self.payload = payload
+        self._random = random.Random(seed)
+
+    def run(self, model, model_input):
+        delay = max(0.0, self.latency_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms))
+        time.sleep(delay / 1000)
+
+        roll = self._random.random()
+        if roll < self.credit_error_rate:
+            raise RuntimeError("ReplicateError Details: status: 402, detail: "
+                               "You have insufficient credit to run this model. Insufficient credit")
+        if roll < self.credit_error_rate + self.error_rate:
+            raise RuntimeError("Prediction failed: simulated error from fake backend")
+
+        url = f"https://fake.replicate.delivery/{model.replace('/', '-')}/{self._random.getrandbits(64):016x}.jpg"
+        if self.payload == 'url':
+            return url
+        if self.payload == 'file_output':
+            return FakeFileOutput(url)
+        return [FakeFileOutput(url)]
+
+
+def backend_from_env(api_token=None):
+    """The backend named by GENERATOR_BACKEND, configured from the environment"""
+    kind = os.getenv('GENERATOR_BACKEND', 'replicate').lower()
+    if kind == 'replicate':
+        return ReplicateBackend(api_token)
+    if kind == 'fake':
+        return FakeBackend(
+            latency_ms=float(os.getenv('FAKE_LATENCY_MS', '1500')),
+            jitter_ms=float(os.getenv('FAKE_JITTER_MS', '500')),
+            error_rate=float(os.getenv('FAKE_ERROR_RATE', '0')),
+            credit_error_rate=float(os.getenv('FAKE_CREDIT_ERROR_RATE', '0')),
+            payload=os.getenv('FAKE_PAYLOAD', 'list'),
+        )
+    raise ValueError(f"Unknown GENERATOR_BACKEND '{kind}' (use 'replicate' or 'fake')")
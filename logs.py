@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Structured Logging
+
+One JSON object per line on stderr, with any keyword fields passed via
+`extra={'fields': {...}}`. The level comes from LOG_LEVEL (default INFO), so
+debug calls are skipped before their message is ever formatted:
+
+    log.debug("Calling model %s", model, extra={'fields': {'idx': idx}})
+"""
+
+import json
+import logging
+import os
+import sys
+import time
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            'ts': time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(record.created)) + f'.{int(record.msecs):03d}Z',
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        entry.update(getattr(record, 'fields', None) or {})
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def configure_logging(level=None):
+    """Route the app's loggers through the JSON formatter at LOG_LEVEL"""
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(JsonFormatter())
+    root = logging.getLogger('dream')
+    root.handlers = [handler]
+    root.propagate = False
+    root.setLevel((level or os.getenv('LOG_LEVEL', 'INFO')).upper())
+    return root
+
+
+def get_logger(name):
+    return logging.getLogger(f'dream.{name}')
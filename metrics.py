@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Request Metrics
+
+A small in-process registry of latency histograms, counters and gauges,
+exposed in Prometheus text format by the app's /metrics endpoint.
+
+    from metrics import timed, count, in_flight
+
+    with timed('score'):
+        ...
+    count('cache_lookups_total', cache='images', result='hit')
+    with in_flight('generation', kind='ai'):
+        ...
+
+Recording is a lock plus a bisect, cheap enough for every request.
+"""
+
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+# Seconds; spans sub-millisecond scoring up to multi-second remote generation
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+HELP = {
+    'http_request_duration_seconds': 'Request latency by endpoint (streamed responses until the last byte)',
+    'stage_duration_seconds': 'Latency of one stage of request handling',
+    'cache_lookups_total': 'Cache lookups by result',
+    'cache_hit_ratio': 'Hits / lookups per cache since start',
+    'in_flight': 'Operations currently running',
+}
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.n = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.n += 1
+
+    def quantile(self, q):
+        """Upper bucket bound containing the q-quantile (None if empty)"""
+        if not self.n:
+            return None
+        target = q * self.n
+        seen = 0
+        for bound, c in zip(self.buckets + (float('inf'),), self.counts):
+            seen += c
+            if seen >= target:
+                return bound
+        return float('inf')
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms = {}
+        self.counters = {}
+        self.gauges = {}
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def add_gauge(self, name, amount, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.gauges[key] = self.gauges.get(key, 0) + amount
+
+    def cache_hit_ratios(self):
+        lookups = {}
+        for (name, labels), value in self.counters.items():
+            if name == 'cache_lookups_total':
+                labels = dict(labels)
+                hits, total = lookups.get(labels['cache'], (0, 0))
+                lookups[labels['cache']] = (hits + (value if labels['result'] == 'hit' else 0), total + value)
+        return {cache: hits / total for cache, (hits, total) in lookups.items() if total}
+
+    def prometheus(self):
+        """Exposition in Prometheus text format"""
+        def fmt(labels):
+            if not labels:
+                return ''
+            return '{' + ','.join(f'{k}="{v}"' for k, v in labels) + '}'
+
+        lines = []
+        described = set()
+
+        def describe(name, kind):
+            if name not in described:
+                described.add(name)
+                lines.append(f'# HELP {name} {HELP.get(name, name)}')
+                lines.append(f'# TYPE {name} {kind}')
+
+        with self._lock:
+            for (name, labels), h in sorted(self.histograms.items()):
+                describe(name, 'histogram')
+                cumulative = 0
+                for bound, c in zip(h.buckets, h.counts):
+                    cumulative += c
+                    lines.append(f'{name}_bucket{fmt(labels + (("le", bound),))} {cumulative}')
+                lines.append(f'{name}_bucket{fmt(labels + (("le", "+Inf"),))} {h.n}')
+                lines.append(f'{name}_sum{fmt(labels)} {h.total}')
+                lines.append(f'{name}_count{fmt(labels)} {h.n}')
+            for (name, labels), value in sorted(self.counters.items()):
+                describe(name, 'counter')
+                lines.append(f'{name}{fmt(labels)} {value}')
+            for (name, labels), value in sorted(self.gauges.items()):
+                describe(name, 'gauge')
+                lines.append(f'{name}{fmt(labels)} {value}')
+            for cache, ratio in sorted(self.cache_hit_ratios().items()):
+                describe('cache_hit_ratio', 'gauge')
+                lines.append(f'cache_hit_ratio{fmt((("cache", cache),))} {ratio}')
+        return '\n'.join(lines) + '\n'
+
+    def summary(self):
+        """JSON-friendly view with approximate p50/p99 per histogram"""
+        with self._lock:
+            return {
+                'histograms': [
+                    {'name': name, 'labels': dict(labels), 'count': h.n,
+                     'mean_s': h.total / h.n if h.n else None,
+                     'p50_s': h.quantile(0.5), 'p99_s': h.quantile(0.99)}
+                    for (name, labels), h in sorted(self.histograms.items())
+                ],
+                'counters': [{'name': n, 'labels': dict(l), 'value': v}
+                             for (n, l), v in sorted(self.counters.items())],
+                'gauges': [{'name': n, 'labels': dict(l), 'value': v}
+                           for (n, l), v in sorted(self.gauges.items())],
+                'cache_hit_ratio': self.cache_hit_ratios(),
+            }
+
+
+registry = Registry()
+
+# Search workers are forked while other threads may be recording (see
+# search.py); a child must not inherit the lock in a held state
+os.register_at_fork(after_in_child=lambda: setattr(registry, '_lock', threading.Lock()))
+
+
+def observe_stage(stage, seconds):
+    registry.observe('stage_duration_seconds', seconds, stage=stage)
+
+
+@contextmanager
+def timed(stage):
+    """Record how long the block takes as one stage of the current request"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - start)
+
+
+def count(name, amount=1, **labels):
+    registry.inc(name, amount, **labels)
+
+
+@contextmanager
+def in_flight(what, **labels):
+    """Gauge of operations currently inside the block"""
+    registry.add_gauge('in_flight', 1, what=what, **labels)
+    try:
+        yield
+    finally:
+        registry.add_gauge('in_flight', -1, what=what, **labels)
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Weighted Entry Points
+
+Uniform draws over the collection almost always start visitors in its
+majority (about half the works are by American artists, about 81% by men).
+A Sampler draws artworks with a chosen distribution over the groups of one
+coded column (see columns.py):
+
+    uniform    - every artwork equally likely (the original behaviour)
+    stratified - every group equally likely, then a uniform artwork within it
+    inverse    - group weight count ** (1 - strength); 0 is uniform,
+                 1 is stratified, in between tempers the majority
+    weights    - caller-supplied {label: weight}; unlisted groups get 0
+
+Each draw is O(1): an alias table picks the group and the group's slice of
+a precomputed row index picks the artwork. Indexes are built per column on
+first use and alias tables are cached per distribution.
+"""
+
+import threading
+import numpy as np
+
+
+SAMPLING_COLUMNS = ['nationality', 'gender', 'department', 'decade']
+SAMPLING_MODES = ['uniform', 'stratified', 'inverse', 'weights']
+
+MAX_BATCH = 1000
+_MAX_TABLES = 256
+
+
+class AliasTable:
+    """Vose's alias method over the positive weights: O(n) to build, O(1) per draw"""
+
+    def __init__(self, weights):
+        weights = np.asarray(weights, dtype=np.float64)
+        if weights.ndim != 1 or (weights < 0).any() or weights.sum() <= 0:
+            raise ValueError('weights must be non-negative with a positive sum')
+
+        # Zero-weight outcomes are left out so rounding can never draw them
+        self.outcomes = np.flatnonzero(weights)
+        weights = weights[self.outcomes]
+        total = weights.sum()
+        n = len(weights)
+        scaled = weights * (n / total)
+        self.prob = np.ones(n)
+        self.alias = np.arange(n)
+        small = [i for i in range(n) if scaled[i] < 1.0]
+        large = [i for i in range(n) if scaled[i] >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        # Whatever is left over has probability 1 up to rounding
+
+    def sample(self, rng, size):
+        slots = rng.integers(0, len(self.prob), size=size)
+        keep = rng.random(size) < self.prob[slots]
+        return self.outcomes[np.where(keep, slots, self.alias[slots])]
+
+
+class GroupIndex:
+    """Row indices of one column sorted by code, with each code's slice"""
+
+    def __init__(self, codes, labels):
+        self.labels = labels
+        self.rows = np.argsort(codes, kind='stable').astype(np.int64)
+        self.counts = np.bincount(codes, minlength=len(labels))
+        self.offsets = np.concatenate([[0], np.cumsum(self.counts)[:-1]])
+
+    def sample_rows(self, rng, groups):
+        """One uniformly chosen row from each given group"""
+        within = (rng.random(len(groups)) * self.counts[groups]).astype(np.int64)
+        return self.rows[self.offsets[groups] + within]
+
+
+def parse_weights(text):
+    """'female:3,male:1' -> {'female': 3.0, 'male': 1.0}"""
+    weights = {}
+    for part in filter(None, (p.strip() for p in text.split(','))):
+        label, sep, value = part.rpartition(':')
+        if not sep:
+            raise ValueError(f"Weight '{part}' should look like label:weight")
+        try:
+            weights[label.strip()] = float(value)
+        except ValueError:
+            raise ValueError(f"Weight for '{label.strip()}' is not a number")
+    return weights
+
+
+class Sampler:
+    """Weighted random artworks for one snapshot's coded columns"""
+
+    def __init__(self, columns):
+        self.columns = columns
+        self.n_rows = len(next(iter(columns.values()))['codes'])
+        self._indexes = {}
+        self._tables = {}
+        self._lock = threading.Lock()
+
+    def index(self, column):
+        if column not in SAMPLING_COLUMNS:
+            raise ValueError(f"Cannot sample by '{column}'; use one of {', '.join(SAMPLING_COLUMNS)}")
+        with self._lock:
+            index = self._indexes.get(column)
+            if index is None:
+                col = self.columns[column]
+                index = self._indexes[column] = GroupIndex(col['codes'], col['labels'])
+        return index
+
+    def group_weights(self, column, mode, strength=0.5, weights=None, include_unknown=False):
+        """Probability mass per code of `column` under a sampling mode"""
+        index = self.index(column)
+        counts = index.counts.astype(np.float64)
+        present = counts > 0
+        if not include_unknown:
+            present[0] = False
+
+        if mode == 'stratified':
+            mass = present.astype(np.float64)
+        elif mode == 'inverse':
+            if not 0 <= strength <= 1:
+                raise ValueError('strength must be between 0 and 1')
+            mass = np.where(present, counts ** (1 - strength), 0.0)
+        elif mode == 'weights':
+            if not weights:
+                raise ValueError("mode 'weights' needs weights, e.g. female:3,male:1")
+            code_of = {label: code for code, label in enumerate(index.labels)}
+            unknown = [label for label in weights if label not in code_of]
+            if unknown:
+                raise ValueError(f"No {column} called {', '.join(map(repr, unknown))}")
+            mass = np.zeros(len(counts))
+            for label, weight in weights.items():
+                if not np.isfinite(weight) or weight < 0:
+                    raise ValueError('weights must be finite and non-negative')
+                mass[code_of[label]] = weight
+            mass[counts == 0] = 0.0
+        else:
+            raise ValueError(f"Unknown sampling mode '{mode}'; use one of {', '.join(SAMPLING_MODES)}")
+
+        if not (mass > 0).any():
+            raise ValueError(f'No artworks to sample by {column} with these weights')
+        mass = mass / mass.max()  # so huge weights can't overflow the sum
+        return mass / mass.sum()
+
+    def table(self, column, mode, strength=0.5, weights=None, include_unknown=False):
+        key = (column, mode, strength if mode == 'inverse' else None,
+               tuple(sorted(weights.items())) if mode == 'weights' else None, include_unknown)
+        with self._lock:
+            table = self._tables.get(key)
+        if table is None:
+            table = AliasTable(self.group_weights(column, mode, strength, weights, include_unknown))
+            with self._lock:
+                if len(self._tables) >= _MAX_TABLES:
+                    self._tables.clear()
+                self._tables[key] = table
+        return table
+
+    def sample(self, n=1, column=None, mode='uniform', strength=0.5, weights=None,
+               include_unknown=False, seed=None):
+        """
+        Draw n artwork indices (with replacement).
+
+        Returns (indices, group labels or None for uniform draws).
+        """
+        if not 1 <= n <= MAX_BATCH:
+            raise ValueError(f'n must be between 1 and {MAX_BATCH}')
+        rng = np.random.default_rng(seed)
+        if mode == 'uniform':
+            return rng.integers(0, self.n_rows, size=n), None
+        if column is None:
+            raise ValueError(f"mode '{mode}' needs a column to sample by")
+
+        index = self.index(column)
+        groups = self.table(column, mode, strength, weights, include_unknown).sample(rng, n)
+        return index.sample_rows(rng, groups), [index.labels[g] for g in groups]
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Sharded Similarity Search
+
+The embedding matrix is split into contiguous row shards. Each shard lives in
+its own worker process (one single-worker process pool per shard, so a shard
+is always answered by the process that holds it). A query is fanned out to
+every shard with its categorical filters, each shard returns its local top-k,
+and the coordinator merges them into the global top-k.
+
+With workers=0 the same shard code runs in-process on a single shard, which
+is what small collections and development servers use.
+
+Workers are forked. At startup that happens before any other thread exists;
+a hot reload or LAZY_STARTUP forks from a process that is already serving
+requests. Children only run shard code over memory-mapped rows and never
+log, and logging and the metrics registry reset their locks at fork, but
+anything else a thread holds a lock on is copied held (Python 3.12+ warns
+about this). Deployments that can't accept that should use workers=0 with
+reloads and LAZY_STARTUP, or restart instead of reloading.
+
+Shards can also hold the facet matrix (see facets.py) and score a
+facet-weighted query against it instead of the combined embedding.
+"""
+
+import multiprocessing
+import threading
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+from facets import facet_weight_vector
+from logs import get_logger
+from metrics import observe_stage
+
+
+log = get_logger('search')
+
+# Navigation dimensions that filter candidates to the current artwork's value.
+# Nationality and gender also require the value to be known, as before.
+DIMENSION_FILTERS = {
+    'nationality': ('nationality', True),
+    'gender': ('gender', True),
+    'medium': ('medium', False),
+    'department': ('department', False),
+}
+
+
+def unit_rows(embeddings):
+    """Contiguous float32 copy with every row scaled to unit length (zero rows stay zero)"""
+    vectors = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return np.ascontiguousarray(vectors / norms)
+
+
+class Shard:
+    """A contiguous block of rows, pre-normalized for cosine similarity"""
+
+    def __init__(self, embeddings, codes, offset, facets=None):
+        self.unit = unit_rows(embeddings)
+        # Facet blocks are already unit length; rows must not be renormalized
+        self.facets = None if facets is None else np.ascontiguousarray(facets, dtype=np.float32)
+        self.codes = codes
+        self.offset = offset
+
+    def search(self, query_unit, k, filters=None, exclude=None, space='embedding'):
+        """
+        Local top-k as (global indices, similarities, stage seconds), unordered.
+
+        filters maps column name to the required code. space 'facets' scores
+        a weighted facet query against the facet matrix. Stage timings are
+        returned rather than recorded because shards may run in a worker
+        process with its own metrics registry.
+        """
+        matrix = self.facets if space == 'facets' else self.unit
+        t0 = time.perf_counter()
+        mask = None
+        for name, code in (filters or {}).items():
+            match = self.codes[name] == code
+            mask = match if mask is None else mask & match
+
+        rows = None if mask is None else np.flatnonzero(mask)
+        t1 = time.perf_counter()
+
+        scores = matrix @ query_unit if rows is None else matrix[rows] @ query_unit
+        t2 = time.perf_counter()
+
+        if exclude is not None and self.offset <= exclude < self.offset + len(self.unit):
+            local = exclude - self.offset
+            if rows is None:
+                scores[local] = -np.inf
+            else:
+                scores[rows == local] = -np.inf
+
+        k = min(k, len(scores))
+        if k <= 0:
+            ids, sims = np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        else:
+            top = np.argpartition(-scores, k - 1)[:k]
+            ids = (top if rows is None else rows[top]) + self.offset
+            sims = scores[top]
+            keep = np.isfinite(sims)
+            ids, sims = ids[keep], sims[keep]
+        t3 = time.perf_counter()
+
+        return ids, sims, {'filter': t1 - t0, 'score': t2 - t1, 'topk': t3 - t2}
+
+
+# Per-process shard, set by the pool initializer
+_worker_shard = None
+
+
+def _init_worker(embeddings_path, lo, hi, codes, facets_path=None):
+    global _worker_shard
+    embeddings = np.load(embeddings_path, mmap_mode='r')
+    facets = np.load(facets_path, mmap_mode='r')[lo:hi] if facets_path else None
+    _worker_shard = Shard(embeddings[lo:hi], codes, lo, facets)
+
+
+def _search_worker(query_unit, k, filters, exclude, space):
+    return _worker_shard.search(query_unit, k, filters, exclude, space)
+
+
+def _worker_ready():
+    return _worker_shard is not None
+
+
+def merge_top_k(results, k):
+    """Merge per-shard (ids, sims, ...) into a global best-first [(idx, sim), ...]"""
+    if not results:
+        return []
+    ids = np.concatenate([r[0] for r in results])
+    sims = np.concatenate([r[1] for r in results])
+    # Highest similarity first, lowest index breaks ties
+    order = np.lexsort((ids, -sims))[:k]
+    return [(int(ids[i]), float(sims[i])) for i in order]
+
+
+class ShardedSearch:
+    """Coordinator for top-k cosine search over (optionally) sharded workers"""
+
+    def __init__(self, embeddings, columns, embeddings_path=None, workers=0,
+                 facets=None, facets_path=None, facet_info=None):
+        self.embeddings = embeddings
+        self.codes = {name: columns[name]['codes'] for name, _ in DIMENSION_FILTERS.values()}
+        self.facets = facets
+        self.facet_info = facet_info
+        self.workers = workers
+        self._local = None
+        self._pools = []
+
+        if workers <= 0:
+            self._local = Shard(embeddings, self.codes, 0, facets)
+            return
+
+        # fork, not spawn: spawned children would re-run the importing
+        # module (app.py) and load the whole latent space again
+        context = multiprocessing.get_context('fork')
+        if threading.active_count() > 1:
+            log.warning("Forking %d search workers from a process with %d threads; see search.py "
+                        "(SEARCH_WORKERS=0 avoids this with reloads and LAZY_STARTUP)",
+                        workers, threading.active_count())
+        bounds = np.linspace(0, len(embeddings), workers + 1).astype(int)
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            shard_codes = {name: np.ascontiguousarray(c[lo:hi]) for name, c in self.codes.items()}
+            self._pools.append(ProcessPoolExecutor(
+                max_workers=1, mp_context=context, initializer=_init_worker,
+                initargs=(str(embeddings_path), int(lo), int(hi), shard_codes,
+                          str(facets_path) if facets is not None else None)))
+
+        # Start every worker now rather than forking on the first request
+        for pool in self._pools:
+            pool.submit(_worker_ready).result()
+
+    def query_vector(self, idx):
+        vector = np.asarray(self.embeddings[idx], dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def facet_weights(self, weights):
+        """Query multipliers for {facet: weight}; ValueError if they can't be used"""
+        if self.facets is None:
+            raise ValueError('This snapshot was built without facet embeddings')
+        if not isinstance(weights, dict):
+            raise ValueError('facet_weights must map facet names to weights')
+        return facet_weight_vector(weights, self.facet_info)
+
+    def filters_for(self, idx, dimension):
+        """Column filters for navigating from idx along dimension, or None if nothing can match"""
+        if dimension not in DIMENSION_FILTERS:
+            return {}
+        name, require_known = DIMENSION_FILTERS[dimension]
+        code = int(self.codes[name][idx])
+        if require_known and code == 0:
+            return None
+        return {name: code}
+
+    def search(self, query_unit, k, filters=None, exclude=None, space='embedding'):
+        """Global top-k [(idx, similarity), ...] for a unit-length (or facet-weighted) query"""
+        if self._local is not None:
+            results = [self._local.search(query_unit, k, filters, exclude, space)]
+        else:
+            start = time.perf_counter()
+            futures = [pool.submit(_search_worker, query_unit, k, filters, exclude, space)
+                       for pool in self._pools]
+            results = [f.result() for f in futures]
+            observe_stage('shard_fanout', time.perf_counter() - start)
+
+        # The slowest shard sets each stage's latency
+        for stage in ('filter', 'score', 'topk'):
+            observe_stage(stage, max(r[2][stage] for r in results))
+        return merge_top_k(results, k)
+
+    def nearest(self, idx, dimension, k=5, facet_weights=None):
+        """
+        Nearest artworks to idx along a navigation dimension.
+
+        With facet_weights ({'who': 2, 'how': 1}, ...) similarity is the
+        weighted mean of per-facet cosines instead of the combined embedding's.
+        """
+        if facet_weights:
+            multipliers = self.facet_weights(facet_weights)
+            query = np.asarray(self.facets[idx], dtype=np.float32) * multipliers
+            space = 'facets'
+        else:
+            query, space = self.query_vector(idx), 'embedding'
+        filters = self.filters_for(idx, dimension)
+        if filters is None:
+            return []
+        return self.search(query, k, filters, exclude=idx, space=space)
+
+    def close(self):
+        for pool in self._pools:
+            pool.shutdown(wait=True)
+        self._pools = []
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Latent Space Snapshots
+
+Each build writes a complete, immutable snapshot directory under
+outputs/snapshots/<version>/ and then publishes it by atomically rewriting
+outputs/snapshots/CURRENT. A running server can load the newly published
+snapshot in the background and switch over in one reference assignment;
+requests already holding the old snapshot finish on it.
+
+Trees built before snapshots existed keep working: without a CURRENT file
+the legacy outputs/latent_space directory is served as version 'latent_space'.
+"""
+
+import json
+import os
+import threading
+import time
+import numpy as np
+from pathlib import Path
+
+from columns import ARTISTS_PATH, build_columns, load_columns
+from density import load_density
+from details import DetailCache
+from facets import FACETS_FILE, load_facets
+from logs import get_logger
+from sampling import Sampler
+from search import ShardedSearch
+from startup import StartupProfile
+
+
+SNAPSHOT_ROOT = Path('outputs/snapshots')
+LEGACY_DIR = Path('outputs/latent_space')
+
+log = get_logger('snapshot')
+
+# How long a replaced snapshot keeps its search workers for in-flight requests
+RETIRE_AFTER = 60
+
+
+def new_version():
+    """Sortable version name for a fresh build"""
+    return time.strftime('%Y%m%d-%H%M%S')
+
+
+def current_snapshot_dir(root=SNAPSHOT_ROOT):
+    """Directory of the published snapshot, falling back to the legacy layout"""
+    pointer = Path(root) / 'CURRENT'
+    if pointer.exists():
+        version = pointer.read_text().strip()
+        if version:
+            return Path(root) / version
+    return LEGACY_DIR
+
+
+def publish(version, root=SNAPSHOT_ROOT):
+    """Point CURRENT at a fully written snapshot (atomic on POSIX)"""
+    root = Path(root)
+    if not (root / version / 'metadata.json').exists():
+        raise FileNotFoundError(f'No complete snapshot at {root / version}')
+    tmp = root / 'CURRENT.tmp'
+    tmp.write_text(version + '\n')
+    os.replace(tmp, root / 'CURRENT')
+
+
+class Snapshot:
+    """Everything the app serves from one build, loaded read-only"""
+
+    def __init__(self, path, artists_path=ARTISTS_PATH, search_workers=0):
+        self.path = Path(path).resolve()
+        self.load_profile = StartupProfile(origin=time.time())
+        stage = self.load_profile.stage
+
+        # Memory-mapped so bulk exports read straight from the stored file
+        with stage('embeddings'):
+            self.embeddings = np.load(self.path / 'embeddings_reduced.npy', mmap_mode='r')
+        with stage('artworks.json'):
+            with open(self.path / 'artworks.json', 'r') as f:
+                self.artworks = json.load(f)
+        with stage('descriptions.json'):
+            with open(self.path / 'descriptions.json', 'r') as f:
+                self.descriptions = json.load(f)
+        with open(self.path / 'metadata.json', 'r') as f:
+            self.metadata = json.load(f)
+
+        with stage('artists'):
+            with open(artists_path, 'r') as f:
+                artists_data = json.load(f)
+            self.artists = {a['ConstituentID']: a for a in artists_data}
+
+        # Integer-coded categorical columns (encode now if the build predates them)
+        with stage('columns'):
+            self.columns = load_columns(self.path)
+            if self.columns is None:
+                self.columns = build_columns(self.artworks, self.artists)
+
+        # Neighbourhood composition from density.py (None until that stage runs)
+        with stage('density'):
+            density = load_density(self.path)
+            self.density, self.density_arrays = density if density else (None, None)
+
+        # Per-facet matrix for weighted similarity (None for builds without it)
+        with stage('facets'):
+            self.facets, self.facet_info = load_facets(self.path, self.metadata)
+
+        with stage('search'):
+            self.search = ShardedSearch(self.embeddings, self.columns,
+                                        self.path / 'embeddings_reduced.npy', search_workers,
+                                        self.facets, self.path / FACETS_FILE, self.facet_info)
+
+        self.version = str(self.metadata.get('version') or self.path.name)
+        self.details = DetailCache(self)
+        # Images generated for this snapshot's artworks by app.py, keyed by
+        # index; dropped along with the snapshot once a reload retires it
+        self.generated_images = {}
+        self.sampler = Sampler(self.columns)
+        self.tiles_dir = self.path / 'tiles'
+        self.loaded_at = time.time()
+
+    def __len__(self):
+        return len(self.artworks)
+
+    def close(self):
+        """Stop this snapshot's search workers"""
+        self.search.close()
+
+
+class SnapshotStore:
+    """
+    Holds the snapshot requests should use and swaps it on reload.
+
+    Readers take `store.current` once and keep that reference for the whole
+    request; reloads never mutate a snapshot, they replace the reference.
+    """
+
+    def __init__(self, root=SNAPSHOT_ROOT, search_workers=0, background=False):
+        """
+        Loads the published snapshot before returning, or with background=True
+        starts loading it and returns at once; `current` stays None until then.
+        """
+        self.root = Path(root)
+        self.search_workers = search_workers
+        self.current = None
+        self._lock = threading.Lock()
+        if background:
+            self.reload()
+            return
+        self.current = Snapshot(current_snapshot_dir(self.root), search_workers=search_workers)
+        self.status = {'state': 'ready', 'version': self.current.version, 'error': None}
+
+    @property
+    def ready(self):
+        return self.current is not None
+
+    def reload(self, version=None):
+        """
+        Load a snapshot in a background thread, then switch to it.
+
+        Defaults to whatever CURRENT points at. Returns False if a reload is
+        already in progress.
+        """
+        if not self._lock.acquire(blocking=False):
+            return False
+
+        path = self.root / version if version else current_snapshot_dir(self.root)
+        self.status = {'state': 'loading', 'version': version or path.name, 'error': None}
+
+        def load():
+            try:
+                snapshot = Snapshot(path, search_workers=self.search_workers)
+                previous, self.current = self.current, snapshot
+                if previous is not None:
+                    # Requests pinned to the old snapshot may still be searching it
+                    retire = threading.Timer(RETIRE_AFTER, previous.close)
+                    retire.daemon = True
+                    retire.start()
+                self.status = {'state': 'ready', 'version': snapshot.version, 'error': None}
+                log.info("Switched to latent space snapshot %s", snapshot.version,
+                         extra={'fields': {'version': snapshot.version, 'n_artworks': len(snapshot)}})
+            except Exception as e:
+                serving = self.current.version if self.current else None
+                self.status = {'state': 'failed', 'version': serving, 'error': str(e)}
+                log.exception("Snapshot reload failed, still serving %s", serving)
+            finally:
+                self._lock.release()
+
+        threading.Thread(target=load, name='snapshot-reload', daemon=True).start()
+        return True
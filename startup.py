@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Startup Profile
+
+Times each import and load step of app.py so slow cold starts can be traced
+to a cause. The steps are printed once the app is up and served from /ready:
+
+    with profile.stage('import flask'):
+        from flask import Flask
+
+Stages may overlap (e.g. a background snapshot load), so they are reported
+as offsets from process start rather than summed.
+"""
+
+import os
+import threading
+import time
+
+
+def _process_start():
+    """Wall-clock time this process was started (now, if /proc is unavailable)"""
+    try:
+        with open('/proc/self/stat') as f:
+            start_ticks = int(f.read().rsplit(')', 1)[1].split()[19])
+        with open('/proc/stat') as f:
+            boot = next(int(line.split()[1]) for line in f if line.startswith('btime'))
+        return boot + start_ticks / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, IndexError, StopIteration):
+        return time.time()
+
+
+class StartupProfile:
+    """Named stages with their start offset from `origin` (default: process start)"""
+
+    def __init__(self, origin=None):
+        self.origin = _process_start() if origin is None else origin
+        self.stages = []
+        self._lock = threading.Lock()
+
+    def stage(self, name):
+        return _Stage(self, name)
+
+    def record(self, name, started, seconds):
+        with self._lock:
+            self.stages.append({
+                'stage': name,
+                'start_s': round(started - self.origin, 4),
+                'seconds': round(seconds, 4),
+            })
+
+    def report(self):
+        with self._lock:
+            return sorted(self.stages, key=lambda s: s['start_s'])
+
+    def summary(self, top=5):
+        """One line naming the slowest stages"""
+        slowest = sorted(self.report(), key=lambda s: -s['seconds'])[:top]
+        return ', '.join(f"{s['stage']} {s['seconds']:.2f}s" for s in slowest)
+
+
+class _Stage:
+    def __init__(self, profile, name):
+        self.profile = profile
+        self.name = name
+
+    def __enter__(self):
+        self.wall = time.time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profile.record(self.name, self.wall, time.perf_counter() - self.start)
+
+
+profile = StartupProfile()
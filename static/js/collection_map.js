@@ -0,0 +1,259 @@
+// What the Dream Obscures - Collection Map (tiled 2D view of every artwork)
+
+let mapManifest = null;
+let mapView = { cx: 0.5, cy: 0.5, zoom: 0 };  // Center in unit square, zoom is log2 scale
+let mapTiles = new Map();  // "z/x/y" -> decoded tile, or null while loading
+let mapCanvas = null;
+let mapDrag = null;
+
+document.addEventListener('DOMContentLoaded', () => {
+    document.getElementById('mapBtn')?.addEventListener('click', openCollectionMap);
+    document.getElementById('closeMap')?.addEventListener('click', () => {
+        document.getElementById('mapOverlay').style.display = 'none';
+    });
+});
+
+async function openCollectionMap() {
+    document.getElementById('mapOverlay').style.display = 'flex';
+
+    if (!mapManifest) {
+        if (!await loadMapManifest()) return;
+        if (!mapCanvas) initializeMapCanvas();
+    }
+
+    resizeMapCanvas();
+    drawCollectionMap();
+}
+
+async function loadMapManifest() {
+    try {
+        const response = await fetch('/api/tiles/index.json');
+        if (!response.ok) {
+            document.getElementById('mapStatus').textContent = 'Map tiles have not been built yet';
+            return false;
+        }
+        mapManifest = await response.json();
+        mapTiles.clear();
+        return true;
+    } catch (error) {
+        console.error('Error loading map manifest:', error);
+        document.getElementById('mapStatus').textContent = 'Failed to load the map';
+        return false;
+    }
+}
+
+function initializeMapCanvas() {
+    mapCanvas = document.getElementById('mapCanvas');
+
+    mapCanvas.addEventListener('wheel', (event) => {
+        event.preventDefault();
+        const [ux, uy] = screenToUnit(event.offsetX, event.offsetY);
+        const maxZoom = mapManifest.max_zoom + 3;
+        mapView.zoom = Math.min(maxZoom, Math.max(0, mapView.zoom - event.deltaY * 0.002));
+        // Keep the point under the cursor fixed while zooming
+        const [nx, ny] = screenToUnit(event.offsetX, event.offsetY);
+        mapView.cx += ux - nx;
+        mapView.cy += uy - ny;
+        drawCollectionMap();
+    }, { passive: false });
+
+    mapCanvas.addEventListener('mousedown', (event) => {
+        mapDrag = { x: event.offsetX, y: event.offsetY, moved: false };
+    });
+
+    mapCanvas.addEventListener('mousemove', (event) => {
+        if (!mapDrag) return;
+        const scale = mapPixelsPerUnit();
+        mapView.cx -= (event.offsetX - mapDrag.x) / scale;
+        mapView.cy -= (event.offsetY - mapDrag.y) / scale;
+        mapDrag.moved = mapDrag.moved || Math.abs(event.offsetX - mapDrag.x) + Math.abs(event.offsetY - mapDrag.y) > 2;
+        mapDrag.x = event.offsetX;
+        mapDrag.y = event.offsetY;
+        drawCollectionMap();
+    });
+
+    mapCanvas.addEventListener('mouseup', (event) => {
+        if (mapDrag && !mapDrag.moved) {
+            selectArtworkFromMap(event.offsetX, event.offsetY);
+        }
+        mapDrag = null;
+    });
+
+    mapCanvas.addEventListener('mouseleave', () => { mapDrag = null; });
+    window.addEventListener('resize', () => {
+        if (document.getElementById('mapOverlay').style.display !== 'none') {
+            resizeMapCanvas();
+            drawCollectionMap();
+        }
+    });
+}
+
+function resizeMapCanvas() {
+    mapCanvas.width = mapCanvas.clientWidth;
+    mapCanvas.height = mapCanvas.clientHeight;
+}
+
+function mapPixelsPerUnit() {
+    return Math.min(mapCanvas.width, mapCanvas.height) * Math.pow(2, mapView.zoom);
+}
+
+function screenToUnit(sx, sy) {
+    const scale = mapPixelsPerUnit();
+    return [
+        mapView.cx + (sx - mapCanvas.width / 2) / scale,
+        mapView.cy + (sy - mapCanvas.height / 2) / scale
+    ];
+}
+
+function unitToScreen(ux, uy) {
+    const scale = mapPixelsPerUnit();
+    return [
+        (ux - mapView.cx) * scale + mapCanvas.width / 2,
+        (uy - mapView.cy) * scale + mapCanvas.height / 2
+    ];
+}
+
+function visibleTiles() {
+    // Tile level follows the view zoom, capped at the deepest level built
+    const z = Math.max(mapManifest.min_zoom, Math.min(mapManifest.max_zoom, Math.ceil(mapView.zoom)));
+    const n = 1 << z;
+    const [left, top] = screenToUnit(0, 0);
+    const [right, bottom] = screenToUnit(mapCanvas.width, mapCanvas.height);
+
+    const tiles = [];
+    const clamp = (v) => Math.max(0, Math.min(n - 1, Math.floor(v * n)));
+    for (let x = clamp(left); x <= clamp(right); x++) {
+        for (let y = clamp(top); y <= clamp(bottom); y++) {
+            tiles.push({ z, x, y, key: `${z}/${x}/${y}` });
+        }
+    }
+    return tiles;
+}
+
+async function loadTile(tile) {
+    mapTiles.set(tile.key, null);
+    try {
+        const response = await fetch(`/api/tiles/${mapManifest.tiles_version}/${tile.key}.bin`);
+        if (response.status === 404) {
+            // The server switched snapshots or rebuilt its tiles - start over with the new manifest
+            if (mapManifest) {
+                mapManifest = null;
+                if (await loadMapManifest()) drawCollectionMap();
+            }
+            return;
+        }
+        const buffer = await response.arrayBuffer();
+        mapTiles.set(tile.key, decodeTile(buffer));
+        drawCollectionMap();
+    } catch (error) {
+        console.error(`Error loading tile ${tile.key}:`, error);
+        mapTiles.delete(tile.key);
+    }
+}
+
+function decodeTile(buffer) {
+    // Records are little-endian and laid out as described in the manifest
+    const size = mapManifest.record_size;
+    const count = buffer.byteLength / size;
+    const offsets = {};
+    mapManifest.fields.forEach(f => { offsets[f.name] = f.offset; });
+
+    const view = new DataView(buffer);
+    const tile = {
+        count,
+        x: new Float32Array(count),
+        y: new Float32Array(count),
+        id: new Uint32Array(count),
+        department: new Uint8Array(count)
+    };
+    for (let i = 0; i < count; i++) {
+        const base = i * size;
+        tile.x[i] = view.getFloat32(base + offsets.x, true);
+        tile.y[i] = view.getFloat32(base + offsets.y, true);
+        tile.id[i] = view.getUint32(base + offsets.id, true);
+        tile.department[i] = view.getUint8(base + offsets.department);
+    }
+    return tile;
+}
+
+function departmentColor(code) {
+    const n = mapManifest.categories.department.length;
+    return code === 0 ? '#4a4a5a' : `hsl(${(code / n) * 360}, 80%, 60%)`;
+}
+
+function drawCollectionMap() {
+    if (!mapCanvas || !mapManifest) return;
+
+    const ctx = mapCanvas.getContext('2d');
+    ctx.fillStyle = '#0a0a0f';
+    ctx.fillRect(0, 0, mapCanvas.width, mapCanvas.height);
+
+    const tiles = visibleTiles();
+    let drawn = 0;
+    const pointSize = Math.max(1, Math.min(4, mapView.zoom));
+
+    tiles.forEach(tile => {
+        if (!mapTiles.has(tile.key)) {
+            loadTile(tile);
+            return;
+        }
+        const data = mapTiles.get(tile.key);
+        if (!data) return;
+
+        for (let i = 0; i < data.count; i++) {
+            const [sx, sy] = unitToScreen(data.x[i], data.y[i]);
+            ctx.fillStyle = departmentColor(data.department[i]);
+            ctx.fillRect(sx, sy, pointSize, pointSize);
+        }
+        drawn += data.count;
+    });
+
+    document.getElementById('mapStatus').textContent =
+        `${drawn.toLocaleString()} of ${mapManifest.n_points.toLocaleString()} artworks shown • scroll to zoom, drag to pan, click to visit`;
+}
+
+async function selectArtworkFromMap(sx, sy) {
+    // Nearest drawn point within a few pixels of the click
+    let best = null;
+    let bestDist = 36;
+    visibleTiles().forEach(tile => {
+        const data = mapTiles.get(tile.key);
+        if (!data) return;
+        for (let i = 0; i < data.count; i++) {
+            const [px, py] = unitToScreen(data.x[i], data.y[i]);
+            const dist = (px - sx) ** 2 + (py - sy) ** 2;
+            if (dist < bestDist) {
+                bestDist = dist;
+                best = data.id[i];
+            }
+        }
+    });
+    if (best === null) return;
+
+    try {
+        const response = await fetch(`/api/artwork/${best}?v=${encodeURIComponent(mapManifest.version)}`);
+        const artwork = await response.json();
+
+        document.getElementById('mapOverlay').style.display = 'none';
+
+        // Jumping via the map leaves the current node behind, like a graph step
+        if (currentArtwork) {
+            networkData.nodes.update({
+                id: `art_${currentArtwork.index}`,
+                size: 15,
+                color: { border: '#00ff88', background: '#1a1a28' }
+            });
+        }
+        path.push({
+            idx: artwork.index,
+            artwork: artwork,
+            latent_data: null,
+            latent_url: null,
+            ai_url: null,
+            gan_url: null
+        });
+        loadArtwork(artwork);
+    } catch (error) {
+        console.error('Error loading artwork from map:', error);
+    }
+}
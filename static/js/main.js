@@ -179,92 +179,117 @@ function loadArtwork(artwork) {
     // Update path history IMMEDIATELY
     updatePathHistory();
     
-    // Everything below happens in background, non-blocking
-    updateGraph(artwork);
-    generateAllVisualizations(artwork);
+    // Neighbours and every visualization arrive over one streamed step
+    updateGraph(artwork, true);
 }
 
-async function generateAllVisualizations(artwork) {
-    // Generate latent space viz (for transparency section)
+let currentStep = 0;  // Streams from earlier steps keep filling in their path items only
+
+async function streamStep(artwork, currentNodeId, generate) {
+    const step = ++currentStep;
+    const live = () => step === currentStep;
+    
+    currentNeighbors = [];
+    const seenNeighbors = new Set();
+    const handlers = {
+        neighbors: event => live() && showNeighbors(artwork, currentNodeId, event, seenNeighbors),
+        latent: event => showLatent(artwork, event, live()),
+        ai: event => showAi(artwork, event, live()),
+        gan: event => showGan(artwork, event, live())
+    };
+    
     try {
-        const latentResponse = await fetch('/api/generate', {
+        const response = await fetch('/api/navigate/stream', {
             method: 'POST',
             headers: {'Content-Type': 'application/json'},
-            body: JSON.stringify({idx: artwork.index, use_ai: false})
+            body: JSON.stringify({
+                current_idx: artwork.index,
+                dimensions: ['similar'],
+                k: 10,
+                generate: generate
+            })
         });
         
-        const latentData = await latentResponse.json();
+        // Errors (bad request, latent space still loading) come back as one JSON object
+        if (!response.ok) {
+            const body = await response.json().catch(() => ({}));
+            throw new Error(body.error || `Navigation step failed (${response.status})`);
+        }
         
-        if (latentData.latent_data) {
-            // Render latent data fast with canvas
-            renderLatentData(latentData.latent_data, 'latentViz');
-            
-            // Update path
-            const pathItem = path.find(p => p.idx === artwork.index);
-            if (pathItem) pathItem.latent_data = latentData.latent_data;
-        } else if (latentData.image_url) {
-            document.getElementById('latentViz').innerHTML = `<img src="${latentData.image_url}" alt="Latent space visualization">`;
-            
-            const pathItem = path.find(p => p.idx === artwork.index);
-            if (pathItem) pathItem.latent_url = latentData.image_url;
+        // One JSON event per line; render each as soon as it arrives
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffered = '';
+        while (true) {
+            const { done, value } = await reader.read();
+            if (done) break;
+            buffered += decoder.decode(value, { stream: true });
+            const lines = buffered.split('\n');
+            buffered = lines.pop();
+            lines.filter(line => line.trim()).forEach(line => {
+                const event = JSON.parse(line);
+                handlers[event.event]?.(event);
+            });
         }
     } catch (error) {
-        console.error('Error generating latent viz:', error);
-        document.getElementById('latentViz').innerHTML = '<div class="viz-placeholder">Failed to generate</div>';
+        console.error('Error streaming navigation step:', error);
+        if (generate && live()) {
+            ['latentViz', 'aiViz', 'ganViz'].forEach(id => {
+                const container = document.getElementById(id);
+                if (container.querySelector('.viz-loading')) {
+                    container.innerHTML = '<div class="viz-placeholder">Failed to generate<br><small>Server error</small></div>';
+                }
+            });
+        }
     }
-    
-    // Generate text-to-image AI viz
-    try {
-        const aiResponse = await fetch('/api/generate', {
-            method: 'POST',
-            headers: {'Content-Type': 'application/json'},
-            body: JSON.stringify({idx: artwork.index, use_ai: true})
-        });
-        
-        const aiData = await aiResponse.json();
+}
+
+function showLatent(artwork, event, live) {
+    if (event.latent_data) {
+        // Update path
+        const pathItem = path.find(p => p.idx === artwork.index);
+        if (pathItem) pathItem.latent_data = event.latent_data;
         
-        if (aiData.latent_data) {
-            // AI generation failed, got latent data fallback
-            console.log('AI generation unavailable, showing latent data');
-            document.getElementById('aiViz').innerHTML = '<div class="viz-placeholder">AI credits exhausted<br><small>Add credits at replicate.com</small></div>';
-        } else if (aiData.image_url) {
-            document.getElementById('aiViz').innerHTML = `<img src="${aiData.image_url}" alt="Text-to-image AI">`;
-            
-            // Update path with AI URL
-            const pathItem = path.find(p => p.idx === artwork.index);
-            if (pathItem) pathItem.ai_url = aiData.image_url;
-            
-            updatePathHistory();
-        }
-    } catch (error) {
-        console.error('Error generating AI viz:', error);
+        // Render latent data fast with canvas
+        if (live) renderLatentData(event.latent_data, 'latentViz');
+    } else if (live) {
+        document.getElementById('latentViz').innerHTML = '<div class="viz-placeholder">Failed to generate</div>';
+    }
+}
+
+function showAi(artwork, event, live) {
+    if (event.image_url) {
+        // Update path with AI URL
+        const pathItem = path.find(p => p.idx === artwork.index);
+        if (pathItem) pathItem.ai_url = event.image_url;
+        updatePathHistory();
+    }
+    if (!live) return;
+    
+    if (event.latent_data) {
+        // AI generation failed, got latent data fallback
+        console.log('AI generation unavailable, showing latent data');
+        document.getElementById('aiViz').innerHTML = '<div class="viz-placeholder">AI credits exhausted<br><small>Add credits at replicate.com</small></div>';
+    } else if (event.image_url) {
+        document.getElementById('aiViz').innerHTML = `<img src="${event.image_url}" alt="Text-to-image AI">`;
+    } else {
         document.getElementById('aiViz').innerHTML = '<div class="viz-placeholder">Failed to generate<br><small>(may need credits)</small></div>';
     }
+}
+
+function showGan(artwork, event, live) {
+    if (event.image_url) {
+        // Update path with GAN URL
+        const pathItem = path.find(p => p.idx === artwork.index);
+        if (pathItem) pathItem.gan_url = event.image_url;
+        updatePathHistory();
+    }
+    if (!live) return;
     
-    // Generate GAN from latent vector
-    try {
-        const ganResponse = await fetch('/api/generate-gan', {
-            method: 'POST',
-            headers: {'Content-Type': 'application/json'},
-            body: JSON.stringify({idx: artwork.index})
-        });
-        
-        const ganData = await ganResponse.json();
-        
-        if (ganData.image_url) {
-            document.getElementById('ganViz').innerHTML = `<img src="${ganData.image_url}" alt="GAN from latent vector">`;
-            
-            // Update path with GAN URL
-            const pathItem = path.find(p => p.idx === artwork.index);
-            if (pathItem) pathItem.gan_url = ganData.image_url;
-            
-            updatePathHistory();
-        } else {
-            document.getElementById('ganViz').innerHTML = '<div class="viz-placeholder">Failed to generate GAN visualization</div>';
-        }
-    } catch (error) {
-        console.error('Error generating GAN viz:', error);
-        document.getElementById('ganViz').innerHTML = '<div class="viz-placeholder">Failed to generate<br><small>Server error</small></div>';
+    if (event.image_url) {
+        document.getElementById('ganViz').innerHTML = `<img src="${event.image_url}" alt="GAN from latent vector">`;
+    } else {
+        document.getElementById('ganViz').innerHTML = '<div class="viz-placeholder">Failed to generate GAN visualization</div>';
     }
 }
 
@@ -417,7 +442,7 @@ function generatePromptForDisplay(artwork) {
     return prompt;
 }
 
-function updateGraph(artwork) {
+function updateGraph(artwork, generate = false) {
     const currentNodeId = `art_${artwork.index}`;
     
     // Update current node style IMMEDIATELY (visual feedback)
@@ -452,74 +477,53 @@ function updateGraph(artwork) {
         }
     });
     
-    // Fetch neighbors in background (truly non-blocking now)
-    fetchNeighborsInBackground(artwork, currentNodeId);
+    // Stream neighbors (and, for a new step, visualizations) in background
+    streamStep(artwork, currentNodeId, generate);
 }
 
-async function fetchNeighborsInBackground(artwork, currentNodeId) {
-    currentNeighbors = [];
-    const seenNeighbors = new Set();
-    
-    try {
-        const response = await fetch('/api/navigate', {
-            method: 'POST',
-            headers: {'Content-Type': 'application/json'},
-            body: JSON.stringify({
-                current_idx: artwork.index,
-                dimension: 'similar',
-                k: 10
-            })
-        });
+function showNeighbors(artwork, currentNodeId, event, seenNeighbors) {
+    (event.neighbors || []).forEach(neighbor => {
+        if (seenNeighbors.has(neighbor.index)) return;
+        seenNeighbors.add(neighbor.index);
         
-        const data = await response.json();
+        const neighborId = `art_${neighbor.index}`;
+        const edgeId = `${currentNodeId}_${neighborId}`;
         
-        if (data.neighbors && data.neighbors.length > 0) {
-            data.neighbors.forEach((neighbor, idx) => {
-                if (seenNeighbors.has(neighbor.index)) return;
-                seenNeighbors.add(neighbor.index);
-                
-                const neighborId = `art_${neighbor.index}`;
-                const edgeId = `${currentNodeId}_${neighborId}`;
-                
-                // Add neighbor node
-                if (!networkData.nodes.get(neighborId)) {
-                    networkData.nodes.add({
-                        id: neighborId,
-                        label: neighbor.title.length > 25 ? neighbor.title.substring(0, 25) + '...' : neighbor.title,
-                        title: `${neighbor.title}\n${neighbor.artist}\n${neighbor.nationality || ''}\nSimilarity: ${(neighbor.similarity * 100).toFixed(1)}%\n\nClick to navigate`,
-                        size: 15,
-                        color: {
-                            border: '#00ff88',
-                            background: '#1a1a28'
-                        }
-                    });
+        // Add neighbor node
+        if (!networkData.nodes.get(neighborId)) {
+            networkData.nodes.add({
+                id: neighborId,
+                label: neighbor.title.length > 25 ? neighbor.title.substring(0, 25) + '...' : neighbor.title,
+                title: `${neighbor.title}\n${neighbor.artist}\n${neighbor.nationality || ''}\nSimilarity: ${(neighbor.similarity * 100).toFixed(1)}%\n\nClick to navigate`,
+                size: 15,
+                color: {
+                    border: '#00ff88',
+                    background: '#1a1a28'
                 }
-                
-                // Add edge
-                const edgeKey = `${artwork.index}->${neighbor.index}`;
-                const isVisited = visitedEdges.has(edgeKey);
-                
-                if (!networkData.edges.get(edgeId)) {
-                    networkData.edges.add({
-                        id: edgeId,
-                        from: currentNodeId,
-                        to: neighborId,
-                        label: `${(neighbor.similarity * 100).toFixed(0)}%`,
-                        color: isVisited ? {color: '#00ff88', highlight: '#00ff88'} : {color: '#2a2a3a', highlight: '#00aaff'},
-                        width: isVisited ? 3 : 2,
-                        data: {
-                            similarity: neighbor.similarity,
-                            visited: isVisited
-                        }
-                    });
+            });
+        }
+        
+        // Add edge
+        const edgeKey = `${artwork.index}->${neighbor.index}`;
+        const isVisited = visitedEdges.has(edgeKey);
+        
+        if (!networkData.edges.get(edgeId)) {
+            networkData.edges.add({
+                id: edgeId,
+                from: currentNodeId,
+                to: neighborId,
+                label: `${(neighbor.similarity * 100).toFixed(0)}%`,
+                color: isVisited ? {color: '#00ff88', highlight: '#00ff88'} : {color: '#2a2a3a', highlight: '#00aaff'},
+                width: isVisited ? 3 : 2,
+                data: {
+                    similarity: neighbor.similarity,
+                    visited: isVisited
                 }
-                
-                currentNeighbors.push({...neighbor, dimension: 'similar'});
             });
         }
-    } catch (error) {
-        console.error(`Error loading neighbors:`, error);
-    }
+        
+        currentNeighbors.push({...neighbor, dimension: event.dimension});
+    });
 }
 
 function getDimensionLabel(dimension) {
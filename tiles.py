@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Collection Map Tiles
+
+Projects the whole collection to 2D and writes a quadtree tile pyramid of
+compact binary point buffers so the frontend can pan and zoom across every
+artwork while only downloading the tiles in view.
+
+Layout under <snapshot dir>/tiles/:
+    index.json      - bounds, zoom levels, record layout, category labels and
+                      a content hash of every tile
+    {z}/{x}/{y}.bin - raw little-endian TILE_DTYPE records, no header
+
+Tiles are served under tiles_version(), a hash of index.json, so rebuilding
+the tiles of a published snapshot moves every tile URL instead of mixing
+cached old tiles with the new manifest.
+
+Level of detail: every point gets a fixed random priority. A tile at zoom z
+holds the highest-priority points that fall inside it (up to tile_capacity),
+so zooming in only ever adds points. The deepest level holds every point.
+
+Usage:
+    ./venv/bin/python tiles.py        # rebuild tiles for the published snapshot
+"""
+
+import hashlib
+import json
+import shutil
+import threading
+import numpy as np
+from pathlib import Path
+
+
+TILE_DTYPE = np.dtype([
+    ('x', '<f4'),            # position inside the unit square [0, 1)
+    ('y', '<f4'),
+    ('id', '<u4'),           # artwork index
+    ('department', 'u1'),    # codes into index.json 'categories'
+    ('gender', 'u1'),
+    ('nationality', '<u2'),
+])
+
+CATEGORY_FIELDS = ['department', 'gender', 'nationality']
+
+
+def project_2d(embeddings):
+    """
+    2D coordinates for every artwork.
+
+    The reduced embeddings are PCA outputs, so their first two columns are
+    already the projection onto the top-2 principal components.
+    """
+    return np.ascontiguousarray(embeddings[:, :2], dtype=np.float64)
+
+
+def normalize_coords(coords):
+    """Map coordinates into the unit square, preserving aspect ratio"""
+    lo = coords.min(axis=0)
+    span = float((coords.max(axis=0) - lo).max()) or 1.0
+    unit = (coords - lo) / span
+    # Keep the max edge strictly below 1 once stored as TILE_DTYPE's float32
+    unit = np.clip(unit, 0.0, np.nextafter(np.float32(1), np.float32(0))).astype(np.float32)
+    return unit, lo, span
+
+
+def build_records(unit_coords, columns):
+    """Pack per-artwork coordinates, ids and category codes into TILE_DTYPE"""
+    records = np.zeros(len(unit_coords), dtype=TILE_DTYPE)
+    records['x'] = unit_coords[:, 0]
+    records['y'] = unit_coords[:, 1]
+    records['id'] = np.arange(len(unit_coords), dtype=np.uint32)
+    for field in CATEGORY_FIELDS:
+        limit = np.iinfo(TILE_DTYPE[field]).max
+        records[field] = np.minimum(columns[field]['codes'], limit)
+    return records
+
+
+def build_pyramid(records, tile_capacity=4096, max_zoom=10, seed=0):
+    """
+    Yield (z, x, y, tile_records) for every non-empty tile.
+
+    Zoom levels stop once every tile fits within tile_capacity (or at
+    max_zoom); the last level yielded always contains every point.
+    """
+    rng = np.random.default_rng(seed)
+    by_priority = records[rng.permutation(len(records))]
+
+    z = 0
+    while True:
+        n = 1 << z
+        # x * n can still round up to n in float32, so clamp to the last tile
+        tx = np.minimum((by_priority['x'] * n).astype(np.int64), n - 1)
+        ty = np.minimum((by_priority['y'] * n).astype(np.int64), n - 1)
+        keys = tx * n + ty
+
+        # Stable sort keeps priority order within each tile
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+        tile_keys, starts, counts = np.unique(sorted_keys, return_index=True, return_counts=True)
+
+        last_level = counts.max() <= tile_capacity or z >= max_zoom
+        for key, start, count in zip(tile_keys, starts, counts):
+            take = count if last_level else min(count, tile_capacity)
+            yield z, int(key // n), int(key % n), by_priority[order[start:start + take]]
+
+        if last_level:
+            return
+        z += 1
+
+
+def write_tiles(output_dir, embeddings, columns, tile_capacity=4096, max_zoom=10):
+    """Project, tile and write the pyramid. Returns the manifest dict."""
+    # Built beside the live tiles and swapped in at the end
+    final_dir = Path(output_dir) / 'tiles'
+    tiles_dir = Path(output_dir) / 'tiles.new'
+    if tiles_dir.exists():
+        shutil.rmtree(tiles_dir)
+    tiles_dir.mkdir(parents=True)
+
+    unit, lo, span = normalize_coords(project_2d(embeddings))
+    records = build_records(unit, columns)
+
+    max_level = 0
+    n_tiles = 0
+    content = hashlib.blake2b(digest_size=16)
+    for z, x, y, tile in build_pyramid(records, tile_capacity, max_zoom):
+        tile_path = tiles_dir / str(z) / str(x) / f'{y}.bin'
+        tile_path.parent.mkdir(parents=True, exist_ok=True)
+        tile.tofile(tile_path)
+        content.update(f'{z}/{x}/{y}:{len(tile)};'.encode())
+        content.update(tile.tobytes())
+        max_level = max(max_level, z)
+        n_tiles += 1
+
+    manifest = {
+        'n_points': int(len(records)),
+        'min_zoom': 0,
+        'max_zoom': max_level,
+        'tile_capacity': tile_capacity,
+        'n_tiles': n_tiles,
+        'projection': 'pca_top2',
+        'bounds': {'x_min': float(lo[0]), 'y_min': float(lo[1]), 'span': span},
+        'record_size': TILE_DTYPE.itemsize,
+        'fields': [
+            {'name': name, 'dtype': TILE_DTYPE[name].str, 'offset': TILE_DTYPE.fields[name][1]}
+            for name in TILE_DTYPE.names
+        ],
+        'categories': {field: columns[field]['labels'] for field in CATEGORY_FIELDS},
+        'content_hash': content.hexdigest(),
+    }
+    with open(tiles_dir / 'index.json', 'w') as f:
+        json.dump(manifest, f)
+
+    if final_dir.exists():
+        shutil.rmtree(final_dir)
+    tiles_dir.rename(final_dir)
+    return manifest
+
+
+_versions = {}
+_versions_lock = threading.Lock()
+
+
+def tiles_version(tiles_dir):
+    """
+    URL key for the tiles in tiles_dir: a hash of index.json, or None if
+    they're not built. Cached per index.json mtime, so a rebuild is picked up
+    without a restart.
+    """
+    index_path = Path(tiles_dir) / 'index.json'
+    try:
+        stat = index_path.stat()
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        with _versions_lock:
+            cached = _versions.get(index_path)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        version = hashlib.blake2b(index_path.read_bytes(), digest_size=8).hexdigest()
+    except OSError:
+        return None
+    with _versions_lock:
+        _versions[index_path] = (stamp, version)
+    return version
+
+
+if __name__ == '__main__':
+    from columns import load_or_build_columns
+    from snapshot import current_snapshot_dir
+
+    LATENT_DIR = current_snapshot_dir()
+
+    print("Building collection map tiles...")
+    embeddings = np.load(LATENT_DIR / 'embeddings_reduced.npy', mmap_mode='r')
+
+    columns = load_or_build_columns(LATENT_DIR)
+
+    manifest = write_tiles(LATENT_DIR, embeddings, columns)
+    print(f"   ✓ Wrote {manifest['n_tiles']:,} tiles, zoom 0-{manifest['max_zoom']} "
+          f"(served as version {tiles_version(LATENT_DIR / 'tiles')})")